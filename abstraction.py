@@ -0,0 +1,450 @@
+import argparse
+import random
+import sys
+import time
+from itertools import combinations
+from multiprocessing import Pool, cpu_count
+
+import numpy as np
+
+from harness import CARD_VALUES, FULL_DECK, atomic_write, hand_strength
+
+STREETS = ("preflop", "flop", "turn", "river")
+BOARD_SIZES = {"preflop": 0, "flop": 3, "turn": 4, "river": 5}
+STREET_NAMES = {0: "preflop", 3: "flop", 4: "turn", 5: "river"}  # Community cards -> street
+SUIT_INDEX = {'Spades': 0, 'Hearts': 1, 'Diamonds': 2, 'Clubs': 3}
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+# Number of suit-isomorphic (hole cards, board) situations on each street
+CANONICAL_COUNTS = {"preflop": 169, "flop": 1286792, "turn": 13960050, "river": 123156254}
+
+
+def canonical_key(hole, board):
+    """
+    Pack a (hole cards, board) situation into an integer that is the same for every suit relabelling of it.
+
+    Suits are renamed in order of which ranks they hold in the hole and on the board, then the hole cards and the
+    board are each sorted and packed six bits per card behind the number of cards.
+
+    Args:
+        hole (list of tuple): The player's two hole cards.
+        board (list of tuple): The community cards (none preflop).
+
+    Returns:
+        int: The situation's key, below 2 ** 45.
+    """
+    hole_masks = [0, 0, 0, 0]
+    board_masks = [0, 0, 0, 0]
+    for rank, suit in hole:
+        hole_masks[SUIT_INDEX[suit]] |= 1 << (CARD_VALUES[rank] - 2)
+    for rank, suit in board:
+        board_masks[SUIT_INDEX[suit]] |= 1 << (CARD_VALUES[rank] - 2)
+
+    order = sorted(range(4), key=lambda suit: (hole_masks[suit], board_masks[suit]), reverse=True)
+    relabel = [0, 0, 0, 0]
+    for new, old in enumerate(order):
+        relabel[old] = new
+
+    key = len(hole) + len(board)
+    for cards in (hole, board):
+        for card in sorted(relabel[SUIT_INDEX[suit]] * 13 + CARD_VALUES[rank] - 2 for rank, suit in cards):
+            key = key << 6 | card
+    return key
+
+
+def strength_features(hole, board, rollouts=50, opponents=2, bins=8, rng=random):
+    """
+    Estimate a situation's expected hand strength and how that strength is spread over the remaining cards.
+
+    Each rollout deals the rest of the board and some opponent hands; the hand's strength in that rollout is the
+    share of opponents it beats (ties count half). The features are the mean strength (EHS) and the cumulative
+    histogram of rollout strengths, so euclidean distance between feature vectors tracks earth mover's distance
+    between the distributions.
+
+    Args:
+        hole (list of tuple): The player's two hole cards.
+        board (list of tuple): The community cards (none preflop).
+        rollouts (int): Runouts to sample.
+        opponents (int): Opponent hands sampled per runout.
+        bins (int): Histogram bins over [0, 1].
+        rng (random.Random): Random number generator.
+
+    Returns:
+        list of float: EHS followed by bins cumulative histogram values.
+    """
+    known = set(hole) | set(board)
+    remaining = [card for card in FULL_DECK if card not in known]
+    missing = 5 - len(board)
+    board = list(board)
+    hole = list(hole)
+
+    histogram = [0] * bins
+    total = 0.0
+    for _ in range(rollouts):
+        drawn = rng.sample(remaining, missing + 2 * opponents)
+        full_board = board + drawn[:missing]
+        mine = hand_strength(hole + full_board)
+        score = 0.0
+        for i in range(missing, missing + 2 * opponents, 2):
+            theirs = hand_strength(drawn[i:i + 2] + full_board)
+            score += 1.0 if mine > theirs else 0.5 if mine == theirs else 0.0
+        strength = score / opponents
+        total += strength
+        histogram[min(int(strength * bins), bins - 1)] += 1
+
+    features = [total / rollouts]
+    running = 0
+    for count in histogram:
+        running += count
+        features.append(running / rollouts)
+    return features
+
+
+def hole_classes():
+    """
+    List one hole card pair for each of the 169 suit-isomorphic starting hands.
+
+    Returns:
+        list of tuple: Pairs of card tuples, pocket pairs first, then suited and offsuit hands.
+    """
+    ranks = sorted(CARD_VALUES, key=CARD_VALUES.get)
+    classes = [((rank, 'Spades'), (rank, 'Hearts')) for rank in ranks]
+    for low, high in combinations(ranks, 2):
+        classes.append(((high, 'Spades'), (low, 'Spades')))
+        classes.append(((high, 'Spades'), (low, 'Hearts')))
+    return classes
+
+
+def canonical_situations(hole, street):
+    """
+    Enumerate the suit-isomorphic situations on a street for one class of hole cards.
+
+    Situations for different hole card classes never share a key, so classes can be enumerated independently.
+
+    Args:
+        hole (tuple): The hole cards representing their class.
+        street (str): "preflop", "flop", "turn" or "river".
+
+    Returns:
+        dict: Canonical key -> one board for each distinct situation.
+    """
+    remaining = [card for card in FULL_DECK if card not in hole]
+    situations = {}
+    for board in combinations(remaining, BOARD_SIZES[street]):
+        key = canonical_key(hole, board)
+        if key not in situations:
+            situations[key] = board
+    return situations
+
+
+def sample_situations(hole, street, limit, rng=random):
+    """
+    Sample up to limit distinct suit-isomorphic situations on a street for one class of hole cards.
+
+    Args:
+        hole (tuple): The hole cards representing their class.
+        street (str): "preflop", "flop", "turn" or "river".
+        limit (int): Situations wanted.
+        rng (random.Random): Random number generator.
+
+    Returns:
+        dict: Canonical key -> one board for each sampled situation.
+    """
+    remaining = [card for card in FULL_DECK if card not in hole]
+    situations = {}
+    for _ in range(limit * 20):
+        board = tuple(rng.sample(remaining, BOARD_SIZES[street]))
+        situations.setdefault(canonical_key(hole, board), board)
+        if len(situations) == limit:
+            break
+    return situations
+
+
+def _class_features(args):
+    """
+    Compute the features of every situation for one hole card class; runs in a worker process.
+
+    Returns the keys as a uint64 array and the features as a float32 array with one row per key, so the parent
+    never holds the situations as Python objects.
+    """
+    hole, street, rollouts, opponents, bins, limit, seed = args
+    rng = random.Random(seed)
+    if limit:
+        situations = sample_situations(hole, street, limit, rng)
+    else:
+        situations = canonical_situations(hole, street)
+    keys = np.fromiter(situations, dtype=np.uint64, count=len(situations))
+    features = np.empty((len(situations), bins + 1), dtype=np.float32)
+    for row, board in enumerate(situations.values()):
+        features[row] = strength_features(hole, board, rollouts, opponents, bins, rng)
+    return keys, features
+
+
+def kmeans(features, k, iterations=25, seed=0, chunk=100000, sample=100000):
+    """
+    Cluster feature vectors with k-means (k-means++ seeding).
+
+    The seeding runs on a random sample of at most sample rows and the assignment steps work chunk rows at a
+    time, so memory beyond the features themselves stays bounded however many rows there are.
+
+    Args:
+        features (numpy.ndarray): One row per point.
+        k (int): Number of clusters.
+        iterations (int): Lloyd iterations.
+        seed (int): Seed for the seeding.
+        chunk (int): Rows assigned at a time, to bound memory.
+        sample (int): Most rows used for the seeding.
+
+    Returns:
+        tuple: (centroids, cluster of every point).
+    """
+    rng = np.random.default_rng(seed)
+    k = min(k, len(features))
+    points = features if len(features) <= sample else features[np.sort(rng.choice(len(features), sample, False))]
+    points = points.astype(np.float64)
+    centroids = [points[rng.integers(len(points))]]
+    distances = ((points - centroids[0]) ** 2).sum(axis=1)
+    for _ in range(1, k):
+        total = distances.sum()
+        index = rng.choice(len(points), p=distances / total) if total > 0 else rng.integers(len(points))
+        centroids.append(points[index])
+        distances = np.minimum(distances, ((points - points[index]) ** 2).sum(axis=1))
+    centroids = np.array(centroids)
+
+    labels = np.zeros(len(features), dtype=np.intp)
+    for _ in range(iterations):
+        sums = np.zeros_like(centroids)
+        for start in range(0, len(features), chunk):
+            block = features[start:start + chunk].astype(np.float64)
+            block_labels = ((block[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+            labels[start:start + chunk] = block_labels
+            for column in range(block.shape[1]):
+                sums[:, column] += np.bincount(block_labels, weights=block[:, column], minlength=k)
+        counts = np.bincount(labels, minlength=k)
+        occupied = counts > 0
+        centroids[occupied] = sums[occupied] / counts[occupied, None]
+    return centroids, labels
+
+
+def _slot(key, bits):
+    """Home slot of a key in a hash table of 2 ** bits slots."""
+    return ((key * HASH_MULTIPLIER) & 0xFFFFFFFFFFFFFFFF) >> (64 - bits)
+
+
+def hash_table(keys, values):
+    """
+    Build an open-addressing hash table of canonical keys, at most half full.
+
+    Keys are inserted in rounds with NumPy: every key still waiting tries its next slot, one key takes each free
+    slot tried, and the rest move one slot on. A key only moves past slots that are taken, so the table is
+    probed by BucketTable.bucket exactly as if the keys had been inserted one by one.
+
+    Args:
+        keys (numpy.ndarray): Canonical keys as uint64 (never 0, which marks an empty slot).
+        values (numpy.ndarray): Bucket of each key.
+
+    Returns:
+        tuple: (slot keys as uint64, slot buckets as uint8 or uint16).
+    """
+    keys = np.asarray(keys, dtype=np.uint64)
+    values = np.asarray(values)
+    bits = max(4, (2 * len(keys) - 1).bit_length())
+    mask = (1 << bits) - 1
+    dtype = np.uint8 if len(values) == 0 or values.max() < 256 else np.uint16
+    slot_keys = np.zeros(1 << bits, dtype=np.uint64)
+    slot_values = np.zeros(1 << bits, dtype=dtype)
+
+    slots = ((keys * np.uint64(HASH_MULTIPLIER)) >> np.uint64(64 - bits)).astype(np.int64)
+    pending = np.arange(len(keys))
+    while len(pending):
+        free = slot_keys[slots] == 0
+        # The first waiting key on each free slot takes it
+        tried, first = np.unique(slots[free], return_index=True)
+        winners = np.flatnonzero(free)[first]
+        slot_keys[tried] = keys[pending[winners]]
+        slot_values[tried] = values[pending[winners]]
+        waiting = np.ones(len(pending), dtype=bool)
+        waiting[winners] = False
+        pending = pending[waiting]
+        slots = (slots[waiting] + 1) & mask
+    return slot_keys, slot_values
+
+
+class BucketTable:
+    """
+    Card abstraction lookup tables: the strength bucket of every canonical situation on every street.
+
+    Buckets are ordered by their centroid's expected hand strength, so bucket 0 is the weakest on each street.
+    Lookups hash the situation's canonical key into an open-addressing table. Situations missing from a table
+    (streets built with a limit) fall back to computing their features and taking the nearest centroid, which is
+    not O(1): it evaluates rollouts * (opponents + 1) hands. The fallback's rollouts are seeded from the key, so a
+    situation always gets the same bucket and lookups never touch the random module's state.
+    """
+
+    def __init__(self, tables, num_buckets, rollouts=50, opponents=2, bins=8, path=None):
+        """
+        Initialize a BucketTable.
+
+        Args:
+            tables (dict): Street -> (slot keys, slot buckets, centroids).
+            num_buckets (int): The most buckets on any street.
+            rollouts (int): Rollouts used for the features, and for fallback lookups.
+            opponents (int): Opponent hands per rollout.
+            bins (int): Histogram bins.
+            path (str, optional): File the tables were loaded from.
+        """
+        self.tables = tables
+        self.num_buckets = num_buckets
+        self.rollouts = rollouts
+        self.opponents = opponents
+        self.bins = bins
+        self.path = path
+        self._bits = {street: int(slots[0].size).bit_length() - 1 for street, slots in tables.items()}
+
+    def bucket(self, hole, board):
+        """
+        Get the strength bucket of a hand.
+
+        Args:
+            hole (list of tuple): The player's two hole cards.
+            board (list of tuple): The community cards (none preflop).
+
+        Returns:
+            int: The bucket, from 0 (weakest) upwards.
+
+        Raises:
+            ValueError: If the tables do not cover the hand's street.
+        """
+        street = STREET_NAMES[len(board)]
+        if street not in self.tables:
+            raise ValueError(f"{self.path or 'These tables'} have no {street} table; build it with "
+                             f"abstraction.py --streets ... {street}")
+        slot_keys, slot_buckets, centroids = self.tables[street]
+        key = canonical_key(hole, board)
+        bits = self._bits[street]
+        i = _slot(key, bits)
+        while slot_keys[i]:
+            if slot_keys[i] == key:
+                return int(slot_buckets[i])
+            i = (i + 1) & ((1 << bits) - 1)
+
+        rng = random.Random(key)
+        features = np.array(strength_features(hole, board, self.rollouts, self.opponents, self.bins, rng))
+        return int(((centroids - features) ** 2).sum(axis=1).argmin())
+
+    def save(self, path):
+        """
+        Save the tables to a compressed .npz file with atomic_write.
+
+        Args:
+            path (str): File path, conventionally ending in .npz.
+        """
+        arrays = {}
+        for street, (slot_keys, slot_buckets, centroids) in self.tables.items():
+            arrays[f"{street}_keys"] = slot_keys
+            arrays[f"{street}_buckets"] = slot_buckets
+            arrays[f"{street}_centroids"] = centroids
+        with atomic_write(path) as file:
+            np.savez_compressed(file, num_buckets=self.num_buckets, rollouts=self.rollouts,
+                                opponents=self.opponents, bins=self.bins, **arrays)
+        self.path = path
+
+    @classmethod
+    def load(cls, path, streets=()):
+        """
+        Load tables saved by save().
+
+        Args:
+            path (str): File path.
+            streets (iterable of str): Streets the caller will look up, e.g. STREETS for a strategy that plays
+                every street; loading fails if any of them was not built.
+
+        Returns:
+            BucketTable: The tables.
+        """
+        with np.load(path) as data:
+            tables = {street: (data[f"{street}_keys"], data[f"{street}_buckets"], data[f"{street}_centroids"])
+                      for street in STREETS if f"{street}_keys" in data}
+            missing = [street for street in streets if street not in tables]
+            if missing:
+                raise ValueError(f"{path} has no {', '.join(missing)} tables")
+            return cls(tables, int(data["num_buckets"]), int(data["rollouts"]), int(data["opponents"]),
+                       int(data["bins"]), path)
+
+
+def build_tables(streets=STREETS, num_buckets=50, rollouts=50, opponents=2, bins=8, processes=None, limit=0,
+                 seed=0, log=print):
+    """
+    Run the offline pipeline: enumerate canonical situations, compute their features and cluster them.
+
+    Work is split across processes by hole card class, and each class's keys and features are copied into
+    arrays preallocated for the street. A full river build holds all 123 million river situations: about 5.5 GB
+    of keys and features and a 2.4 GB lookup table, after tens of core-hours of rollouts (the turn needs about a
+    tenth of that). limit samples that many random situations per hole card class instead.
+
+    Args:
+        streets (tuple of str): Streets to build.
+        num_buckets (int): Buckets per street.
+        rollouts (int): Rollouts per situation.
+        opponents (int): Opponent hands per rollout.
+        bins (int): Histogram bins.
+        processes (int, optional): Worker processes (default is one per core).
+        limit (int): Situations per hole card class and street (0 for all of them).
+        seed (int): Seed for rollouts, sampling and clustering.
+        log (callable): Progress output.
+
+    Returns:
+        BucketTable: The tables for the requested streets.
+    """
+    tables = {}
+    classes = hole_classes()
+    with Pool(processes or cpu_count()) as pool:
+        for street in streets:
+            start = time.perf_counter()
+            jobs = [(hole, street, rollouts, opponents, bins, limit, seed + i) for i, hole in enumerate(classes)]
+            size = CANONICAL_COUNTS[street]
+            if limit:
+                size = min(size, limit * len(classes))
+            keys = np.empty(size, dtype=np.uint64)
+            features = np.empty((size, bins + 1), dtype=np.float32)
+            count = 0
+            for class_keys, class_features in pool.imap(_class_features, jobs):
+                keys[count:count + len(class_keys)] = class_keys
+                features[count:count + len(class_keys)] = class_features
+                count += len(class_keys)
+            keys, features = keys[:count], features[:count]
+
+            centroids, labels = kmeans(features, num_buckets, seed=seed)
+            # Renumber the buckets by expected hand strength
+            order = np.argsort(centroids[:, 0])
+            rank = np.empty_like(order)
+            rank[order] = np.arange(len(order))
+            slot_keys, slot_buckets = hash_table(keys, rank[labels])
+            tables[street] = (slot_keys, slot_buckets, centroids[order].astype(np.float32))
+            log(f"{street}: {len(keys)} situations in {len(centroids)} buckets, {time.perf_counter() - start:.1f}s")
+
+    return BucketTable(tables, num_buckets, rollouts, opponents, bins)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precompute hand strength buckets for every street.")
+    parser.add_argument("--streets", nargs="+", choices=STREETS, default=list(STREETS), help="Streets to build.")
+    parser.add_argument("--buckets", type=int, default=50, help="Buckets per street.")
+    parser.add_argument("--rollouts", type=int, default=50, help="Rollouts per situation.")
+    parser.add_argument("--opponents", type=int, default=2, help="Opponent hands per rollout.")
+    parser.add_argument("--bins", type=int, default=8, help="Strength histogram bins.")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes (default is one per core).")
+    parser.add_argument("--limit", type=int, default=0,
+                        help="Situations sampled per hole card class and street (default is all of them).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for rollouts and clustering.")
+    parser.add_argument("--output", default="buckets.npz", help="Output file.")
+    args = parser.parse_args(argv)
+
+    table = build_tables(args.streets, args.buckets, args.rollouts, args.opponents, args.bins, args.processes,
+                         args.limit, args.seed)
+    table.save(args.output)
+    print(f"Saved {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import time
+
+from harness import Deck, Pot, game_over, hand_steps, next_hand_steps
+from player import Player
+from strategy import DefaultStrategy, Strategy
+
+
+async def act_async(steps):
+    """
+    Drive a generator of decisions, awaiting strategies whose decide_action is a coroutine.
+
+    Args:
+        steps (generator): From hand_steps, preflop_steps or betting_round_steps.
+
+    Returns:
+        What the generator returns.
+    """
+    try:
+        player, community_cards, min_bet = next(steps)
+        while True:
+            action = await player.achoose_action(community_cards, min_bet)
+            player, community_cards, min_bet = steps.send(action)
+    except StopIteration as stop:
+        return stop.value
+
+
+async def play_hand_async(players, dealer, deck, pot, blind):
+    """
+    Plays out a single hand of poker like play_hand, letting other tables run while strategies are awaited.
+
+    Args:
+        players (list of Player): List of players at the table, in seat order.
+        dealer (int): Index of the dealer position among players.
+        deck (Deck): The shuffled deck of cards for the hand.
+        pot (Pot): The main pot.
+        blind (int): The blind amount for the current hand.
+
+    Returns:
+        None
+    """
+    await act_async(hand_steps(players, dealer, deck, pot, blind))
+
+
+async def play_match_async(players, num_hands, blind):
+    """
+    Plays hands like play_match until num_hands have been played or one player has all the chips.
+
+    Args:
+        players (list of Player): List of players at the table, in seat order.
+        num_hands (int): The maximum number of hands to play.
+        blind (int): The blind amount for every hand.
+
+    Returns:
+        int: The number of hands played.
+    """
+    pot = Pot()
+    deck = Deck()
+    current_hand = 1
+    while current_hand <= num_hands and not game_over(players):
+        await act_async(next_hand_steps(players, current_hand, blind, pot, deck))
+
+        current_hand += 1
+
+    return current_hand - 1
+
+
+async def run_tables(tables, num_hands, blind, concurrency=None):
+    """
+    Play a match at every table in one event loop.
+
+    Tables only yield to each other while a strategy is being awaited, so tables of synchronous strategies run
+    one after another and tables waiting on bots over sockets overlap.
+
+    Args:
+        tables (list of list of Player): The players at each table.
+        num_hands (int): The maximum number of hands per table.
+        blind (int): The blind amount for every hand.
+        concurrency (int, optional): Tables allowed to play at once (default is all of them).
+
+    Returns:
+        list of int: The number of hands played at each table.
+    """
+    semaphore = asyncio.Semaphore(concurrency or len(tables) or 1)
+
+    async def run(players):
+        async with semaphore:
+            return await play_match_async(players, num_hands, blind)
+
+    return await asyncio.gather(*(run(players) for players in tables))
+
+
+class SocketStrategy(Strategy):
+    """
+    Asks a bot process for its actions over a local socket.
+
+    The protocol is one JSON object per line in each direction. Requests carry the player's name, chips,
+    round_bet and cards, the community_cards and min_bet, with cards as [rank, suit] pairs; the bot answers
+    {"action": "call"}. The connection is opened on the first decision and reused; one request is in flight at a
+    time. When the bot cannot be reached, does not answer in time, hangs up or answers with something other than
+    an action, the player plays the fallback action for that decision and the connection is dropped, so a late
+    answer cannot be taken for the next request; the next decision reconnects. One dead bot therefore never
+    stops the other tables in run_tables.
+    """
+
+    def __init__(self, host="127.0.0.1", port=9000, timeout=10.0, fallback="fold"):
+        """
+        Initialize a SocketStrategy.
+
+        Args:
+            host (str): Host the bot listens on.
+            port (int): Port the bot listens on.
+            timeout (float): Seconds to wait for connecting, sending and answering before playing the fallback.
+            fallback (str): The action played when the bot fails to answer.
+        """
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.fallback = fallback
+        self._reader = None
+        self._writer = None
+        self._lock = None
+
+    async def decide_action(self, player, community_cards, min_bet):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        request = {
+            "name": player.name,
+            "chips": player.chips,
+            "round_bet": player.round_bet,
+            "cards": player.cards,
+            "community_cards": community_cards,
+            "min_bet": min_bet,
+        }
+        async with self._lock:
+            try:
+                if self._writer is None:
+                    self._reader, self._writer = await asyncio.wait_for(
+                        asyncio.open_connection(self.host, self.port), self.timeout)
+                self._writer.write(json.dumps(request).encode() + b"\n")
+                await asyncio.wait_for(self._writer.drain(), self.timeout)
+                line = await asyncio.wait_for(self._reader.readline(), self.timeout)
+                if not line:
+                    raise ConnectionError("the bot closed the connection")
+                return json.loads(line)["action"]
+            except (asyncio.TimeoutError, OSError, ValueError, KeyError, TypeError) as error:
+                print(f"Bot at {self.host}:{self.port} failed ({error!r}), playing {self.fallback}")
+                await self.close()
+                return self.fallback
+
+    async def close(self):
+        """Close the connection to the bot."""
+        if self._writer is not None:
+            writer = self._writer
+            self._reader = self._writer = None
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+
+async def serve_bot(strategy, host="127.0.0.1", port=0):
+    """
+    Serve a strategy over the SocketStrategy protocol, e.g. as a stand-in for a real bot.
+
+    Args:
+        strategy (Strategy): The strategy answering requests; async strategies are awaited.
+        host (str): Host to listen on.
+        port (int): Port to listen on (0 picks a free one; see the returned server's sockets).
+
+    Returns:
+        asyncio.Server: The running server.
+    """
+
+    async def handle(reader, writer):
+        try:
+            while line := await reader.readline():
+                request = json.loads(line)
+                player = Player(request["name"], chips=request["chips"])
+                player.round_bet = request["round_bet"]
+                player.cards.extend(tuple(card) for card in request["cards"])
+                community_cards = [tuple(card) for card in request["community_cards"]]
+                player.strategy = strategy
+                action = await player.achoose_action(community_cards, request["min_bet"])
+                writer.write(json.dumps({"action": action}).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+async def _serve_forever(strategy, host, port):
+    server = await serve_bot(strategy, host, port)
+    print(f"Serving {type(strategy).__name__} on {host}:{server.sockets[0].getsockname()[1]}")
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run many tables in one event loop.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="Serve DefaultStrategy as a socket bot.")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=9000)
+
+    run = commands.add_parser("run", help="Play a match at many tables at once.")
+    run.add_argument("--tables", type=int, default=100, help="Tables to run.")
+    run.add_argument("--players", type=int, default=3, help="Players per table.")
+    run.add_argument("--hands", type=int, default=100, help="Hands per table.")
+    run.add_argument("--blind", type=int, default=20, help="Big blind.")
+    run.add_argument("--bot", metavar="HOST:PORT", help="Seat a socket bot in the first seat of every table.")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        asyncio.run(_serve_forever(DefaultStrategy(), args.host, args.port))
+        return 0
+
+    tables = []
+    bots = []
+    for table in range(args.tables):
+        players = [Player(f"Table {table} Player {i}", strategy=DefaultStrategy()) for i in range(args.players)]
+        if args.bot:
+            host, port = args.bot.rsplit(":", 1)
+            players[0].strategy = SocketStrategy(host, int(port))
+            bots.append(players[0].strategy)
+        tables.append(players)
+
+    async def run_all():
+        try:
+            return await run_tables(tables, args.hands, args.blind)
+        finally:
+            for bot in bots:
+                await bot.close()
+
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        hands = asyncio.run(run_all())
+    elapsed = time.perf_counter() - start
+    print(f"{sum(hands)} hands at {len(tables)} tables in {elapsed:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,339 @@
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+from harness import (Deck, FULL_DECK, Pot, handle_side_pots, hand_rank, play_hand, play_match, preflop_hand_rank,
+                     showdown)
+from player import Player
+from strategy import DefaultStrategy
+
+
+def memory_benchmark(num_players=9, num_hands=1000):
+    """
+    Measure the memory footprint of seated players and of per-hand table state.
+
+    A hand cycle shuffles the deck, deals two hole cards to every player and five community cards to the pot,
+    then resets the pot, deck and players for the next hand, the same way the game loop does.
+
+    Args:
+        num_players (int): The number of players seated at the table.
+        num_hands (int): The number of hand cycles to measure.
+
+    Returns:
+        dict: Bytes per seated player, peak bytes allocated within a single hand, and bytes retained per hand.
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        players = [Player(f"Player {i}") for i in range(num_players)]
+        per_player = (tracemalloc.get_traced_memory()[0] - before) / num_players
+
+        pot = Pot()
+        deck = Deck()
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        for _ in range(num_hands):
+            deck.reset()
+            deck.shuffle()
+            for _ in range(2):
+                for player in players:
+                    player.cards.append(deck.draw())
+            for _ in range(5):
+                pot.cards.append(deck.draw())
+            pot.reset()
+            for player in players:
+                player.reset()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "players": num_players,
+        "hands": num_hands,
+        "bytes_per_player": per_player,
+        "peak_bytes_per_hand": peak - before,
+        "retained_bytes_per_hand": (current - before) / num_hands,
+    }
+
+
+def showdown_benchmark(num_players, num_hands=2000, seed=0):
+    """
+    Time showdown for a table of players who all reach the river.
+
+    Each hand deals a fresh board and hole cards and gives every player a random commitment, so most hands carry
+    side pots and some split.
+
+    Args:
+        num_players (int): The number of players at the showdown.
+        num_hands (int): The number of showdowns to time.
+        seed (int): Seed for the deals, so runs are comparable.
+
+    Returns:
+        dict: Total seconds spent in showdown and showdowns per second.
+    """
+    rng = random.Random(seed)
+    players = [Player(f"Player {i}", chips=0) for i in range(num_players)]
+    pot = Pot()
+    deck = Deck()
+    elapsed = 0.0
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(num_hands):
+            deck.reset()
+            rng.shuffle(deck.cards)
+            for player in players:
+                player.reset()
+                player.cards.extend((deck.draw(), deck.draw()))
+                pot.commit(player, rng.choice((20, 40, 80, 160)))
+            pot.cards.extend(deck.draw() for _ in range(5))
+
+            start = time.perf_counter()
+            showdown(players, pot)
+            elapsed += time.perf_counter() - start
+
+    return {
+        "players": num_players,
+        "hands": num_hands,
+        "seconds": elapsed,
+        "hands_per_second": num_hands / elapsed,
+    }
+
+
+def bench_hand_rank(size, seed):
+    """Time hand_rank over size random five-card hands."""
+    rng = random.Random(seed)
+    hands = [rng.sample(FULL_DECK, 5) for _ in range(size)]
+    start = time.perf_counter()
+    for hand in hands:
+        hand_rank(hand)
+    return time.perf_counter() - start
+
+
+def bench_preflop_hand_rank(size, seed):
+    """Time preflop_hand_rank over size random two-card hands."""
+    rng = random.Random(seed)
+    hands = [rng.sample(FULL_DECK, 2) for _ in range(size)]
+    start = time.perf_counter()
+    for hand in hands:
+        preflop_hand_rank(hand)
+    return time.perf_counter() - start
+
+
+def bench_showdown(size, seed):
+    """Time size six-player showdowns."""
+    return showdown_benchmark(6, size, seed)["seconds"]
+
+
+def bench_handle_side_pots(size, seed):
+    """Time handle_side_pots over size six-player pots with uneven commitments and a folded player."""
+    rng = random.Random(seed)
+    players = [Player(f"Player {i}") for i in range(6)]
+    players[-1].fold = True
+    pots = []
+    for _ in range(size):
+        pot = Pot()
+        for player in players:
+            pot.commit(player, rng.choice((20, 40, 80, 160, 320)))
+        pots.append(pot)
+    start = time.perf_counter()
+    for pot in pots:
+        handle_side_pots(players, pot)
+    return time.perf_counter() - start
+
+
+def bench_play_hand(size, seed):
+    """Time size full hands of six DefaultStrategy players, topping up chips between hands."""
+    random.seed(seed)
+    players = [Player(f"Player {i}", strategy=DefaultStrategy()) for i in range(6)]
+    pot = Pot()
+    deck = Deck()
+    elapsed = 0.0
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for hand in range(size):
+            for player in players:
+                player.chips = 2000
+            deck.reset()
+            deck.shuffle()
+            start = time.perf_counter()
+            play_hand(players, hand % len(players), deck, pot, 20)
+            elapsed += time.perf_counter() - start
+    return elapsed
+
+
+def bench_match(size, seed):
+    """Time a game.main-style match of up to size hands between three DefaultStrategy players."""
+    random.seed(seed)
+    players = [Player(f"Player {i}", strategy=DefaultStrategy()) for i in range(3)]
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        start = time.perf_counter()
+        play_match(players, size, 20)
+        return time.perf_counter() - start
+
+
+# Benchmark name -> (function, default size)
+SUITE = {
+    "hand_rank": (bench_hand_rank, 20000),
+    "preflop_hand_rank": (bench_preflop_hand_rank, 50000),
+    "showdown": (bench_showdown, 2000),
+    "handle_side_pots": (bench_handle_side_pots, 20000),
+    "play_hand": (bench_play_hand, 200),
+    "match": (bench_match, 100),
+}
+
+
+def run_suite(names=None, scale=1.0, repeat=3, seed=0):
+    """
+    Run the benchmark suite.
+
+    Every benchmark is run repeat times on the same seeded workload; the fastest run is the one compared.
+
+    Args:
+        names (list of str, optional): Benchmarks to run (default is all of SUITE).
+        scale (float): Multiplier applied to every benchmark's default size.
+        repeat (int): Runs per benchmark.
+        seed (int): Seed for the workloads.
+
+    Returns:
+        dict: Run metadata and, per benchmark, its size and best, median and per-operation seconds.
+    """
+    results = {}
+    for name in names or SUITE:
+        function, default_size = SUITE[name]
+        size = max(1, int(default_size * scale))
+        timings = [function(size, seed) for _ in range(repeat)]
+        results[name] = {
+            "size": size,
+            "seconds": min(timings),
+            "median_seconds": statistics.median(timings),
+            "per_op": min(timings) / size,
+        }
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "scale": scale,
+            "repeat": repeat,
+            "seed": seed,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def compare_results(baseline, current, threshold=0.10):
+    """
+    Compare two suite results by seconds per operation.
+
+    Args:
+        baseline (dict): Results from run_suite (or a saved baseline file).
+        current (dict): Results from run_suite.
+        threshold (float): Allowed slowdown as a fraction, e.g. 0.10 for 10%.
+
+    Returns:
+        list of tuple: (name, baseline per_op, current per_op, relative change, regressed) for every benchmark
+        present in both results.
+    """
+    rows = []
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        before = baseline["results"][name]["per_op"]
+        after = result["per_op"]
+        change = after / before - 1
+        rows.append((name, before, after, change, change > threshold))
+    return rows
+
+
+def print_results(results):
+    """Print one line per benchmark in a suite result."""
+    for name, result in results["results"].items():
+        print(f"{name:<20} {result['size']:>8} ops  {result['seconds']:9.4f}s  {result['per_op'] * 1e6:10.2f} us/op")
+
+
+def print_comparison(rows, threshold):
+    """Print a comparison table and return True if any benchmark regressed."""
+    for name, before, after, change, regressed in rows:
+        flag = "REGRESSION" if regressed else ""
+        print(f"{name:<20} {before * 1e6:10.2f} -> {after * 1e6:10.2f} us/op  {change:+7.1%}  {flag}")
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower than the baseline by more than {threshold:.0%}: "
+              + ", ".join(regressions))
+    return bool(regressions)
+
+
+def load_results(path):
+    """Read suite results from a JSON file."""
+    with open(path) as file:
+        return json.load(file)
+
+
+def save_results(results, path):
+    """Write suite results to a JSON file, creating its directory if needed."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Poker harness benchmarks.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    memory = commands.add_parser("memory", help="Bytes per seated player and per hand.")
+    memory.add_argument("--players", type=int, default=9, help="Players seated at the table.")
+    memory.add_argument("--hands", type=int, default=1000, help="Hands to play per measurement.")
+
+    showdowns = commands.add_parser("showdown", help="Showdown throughput for 2 to 9 players.")
+    showdowns.add_argument("--hands", type=int, default=2000, help="Showdowns per table size.")
+
+    run = commands.add_parser("run", help="Run the benchmark suite.")
+    run.add_argument("--only", nargs="+", choices=list(SUITE), help="Benchmarks to run (default is all).")
+    run.add_argument("--scale", type=float, default=1.0, help="Multiplier for every benchmark's size.")
+    run.add_argument("--repeat", type=int, default=3, help="Runs per benchmark; the fastest is kept.")
+    run.add_argument("--seed", type=int, default=0, help="Seed for the workloads.")
+    run.add_argument("--save", metavar="PATH", help="Write the results to a JSON file, e.g. to store a baseline.")
+    run.add_argument("--baseline", metavar="PATH", help="Compare the results against a saved JSON baseline.")
+    run.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown before flagging (0.10 = 10%%).")
+
+    compare = commands.add_parser("compare", help="Compare two saved results files.")
+    compare.add_argument("baseline", help="Baseline JSON file.")
+    compare.add_argument("current", help="Current JSON file.")
+    compare.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown before flagging (0.10 = 10%%).")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run_suite(args.only, args.scale, args.repeat, args.seed)
+        print_results(results)
+        if args.save:
+            save_results(results, args.save)
+        if args.baseline:
+            print()
+            rows = compare_results(load_results(args.baseline), results, args.threshold)
+            return 1 if print_comparison(rows, args.threshold) else 0
+    elif args.command == "compare":
+        rows = compare_results(load_results(args.baseline), load_results(args.current), args.threshold)
+        return 1 if print_comparison(rows, args.threshold) else 0
+    elif args.command == "memory":
+        result = memory_benchmark(args.players, args.hands)
+        print(f"Players: {result['players']}, hands: {result['hands']}")
+        print(f"Bytes per seated player: {result['bytes_per_player']:.1f}")
+        print(f"Peak bytes per hand: {result['peak_bytes_per_hand']}")
+        print(f"Retained bytes per hand: {result['retained_bytes_per_hand']:.1f}")
+    elif args.command == "showdown":
+        for num_players in range(2, 10):
+            result = showdown_benchmark(num_players, args.hands)
+            print(f"{num_players} players: {result['hands_per_second']:.0f} showdowns/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,528 @@
+import argparse
+import bisect
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+from abstraction import STREETS, BucketTable
+from harness import CARD_VALUES, FULL_DECK, atomic_write, hand_strength
+from strategy import Strategy
+
+ACTIONS = ("fold", "call", "raise")
+FOLD, CALL, RAISE = range(3)
+MAX_RAISES = 3  # Raises allowed per betting round by preflop and betting_round
+STREET_CARDS = {0: 0, 3: 1, 4: 2, 5: 3}  # Community cards on the table -> street index
+
+
+def hand_score(hole, board):
+    """
+    Score a player's hand for bucketing; higher is stronger.
+
+    Preflop the score orders starting hands by pair, high card, low card and suitedness. After the flop it is the
+    hand_strength key folded into one float, so it orders hands exactly as showdown does.
+
+    Args:
+        hole (list of tuple): The player's two hole cards.
+        board (list of tuple): The community cards (none preflop).
+
+    Returns:
+        float: The hand's score.
+    """
+    if not board:
+        high, low = sorted((CARD_VALUES[hole[0][0]], CARD_VALUES[hole[1][0]]), reverse=True)
+        if high == low:
+            return 2 + high / 15
+        return high / 15 + low / 225 + (0.5 if hole[0][1] == hole[1][1] else 0)
+
+    key = hand_strength(list(hole) + list(board))
+    score = float(key[0])
+    for i, value in enumerate(key[1:]):
+        score += value / 15 ** (i + 1)
+    return score
+
+
+class StrengthBucketer:
+    """
+    Maps (hole cards, board) to one of num_buckets equally likely strength buckets per street.
+
+    The bucket boundaries are quantiles of hand_score over randomly dealt hands, so each bucket holds about the
+    same share of hands on every street.
+    """
+
+    def __init__(self, num_buckets=8, thresholds=None):
+        """
+        Initialize a StrengthBucketer.
+
+        Args:
+            num_buckets (int): Buckets per street.
+            thresholds (list of list of float, optional): Bucket boundaries per street; calibrate() fills them in.
+        """
+        self.num_buckets = num_buckets
+        self.thresholds = thresholds
+
+    def calibrate(self, samples=20000, seed=0):
+        """
+        Set the bucket boundaries from randomly dealt hands.
+
+        Args:
+            samples (int): Hands to deal.
+            seed (int): Seed for the deals.
+        """
+        rng = random.Random(seed)
+        scores = [[], [], [], []]
+        for _ in range(samples):
+            cards = rng.sample(FULL_DECK, 7)
+            for street, count in enumerate((0, 3, 4, 5)):
+                scores[street].append(hand_score(cards[:2], cards[2:2 + count]))
+        quantiles = np.arange(1, self.num_buckets) / self.num_buckets
+        self.thresholds = [np.quantile(street_scores, quantiles).tolist() for street_scores in scores]
+
+    def bucket(self, hole, board):
+        """
+        Get the strength bucket of a hand.
+
+        Args:
+            hole (list of tuple): The player's two hole cards.
+            board (list of tuple): The community cards (none preflop).
+
+        Returns:
+            int: The bucket, from 0 (weakest) to num_buckets - 1.
+        """
+        return bisect.bisect_right(self.thresholds[STREET_CARDS[len(board)]], hand_score(hole, board))
+
+
+def _bucketer_arrays(bucketer):
+    """Describe a bucketer for a checkpoint: its boundaries, or the path of its lookup tables."""
+    if isinstance(bucketer, BucketTable):
+        return {"bucket_table": os.path.abspath(bucketer.path)}
+    return {"thresholds": np.array(bucketer.thresholds)}
+
+
+def _load_bucketer(data):
+    """Rebuild the bucketer described in a checkpoint."""
+    if "bucket_table" in data:
+        return BucketTable.load(str(data["bucket_table"]), STREETS)
+    thresholds = data["thresholds"].tolist()
+    return StrengthBucketer(len(thresholds[0]) + 1, thresholds)
+
+
+def infoset_key(role, street, committed, round_bet, min_bet):
+    """
+    Build the key of what a player can see when asked to act.
+
+    Strategies only get their own chips and round bet, the community cards and the minimum bet, so that is all
+    the key holds: the player's blind, the street, what the player put in on earlier streets, what they have put
+    in this street, and the bet to match.
+
+    Args:
+        role (str): "sb" for the little blind, "bb" for the big blind.
+        street (int): 0 preflop, 1 flop, 2 turn, 3 river.
+        committed (int): Chips the player put in on earlier streets.
+        round_bet (int): Chips the player has put in this street.
+        min_bet (int): The current bet to match.
+
+    Returns:
+        str: The information set key.
+    """
+    return f"{role}/{street}/{committed}/{round_bet}/{min_bet}"
+
+
+class BettingTree:
+    """
+    The heads-up betting tree of the harness's fixed-limit rules, with identical states merged.
+
+    Raises double min_bet and are capped at MAX_RAISES per round. Preflop the little blind acts first and rounds
+    repeat while someone raised, as in preflop; after the flop the first seat acts first, every call costs the
+    full min_bet and rounds end when action reaches the last raiser or an orbit adds no chips, as in
+    betting_round. Both dealer positions hang off the tree, so the little blind is either seat.
+
+    Nodes are kept in parallel lists; order lists every node after all of its parents.
+    """
+
+    DECISION, FOLDED, SHOWDOWN = range(3)
+
+    def __init__(self, blind=20):
+        """
+        Build the tree.
+
+        Args:
+            blind (int): The big blind, which is also the opening min_bet of every round.
+        """
+        self.blind = blind
+        self.kind = []
+        self.player = []  # Seat to act, or seat that folded
+        self.infoset = []
+        self.street = []
+        self.children = []  # One child per action, -1 where the action is not allowed
+        self.contributions = []  # Chips put in by seat 0 and seat 1 when the hand ends here
+        self.keys = []
+        self.legal = []
+        self.order = []
+        self._key_index = {}
+        self._memo = {}
+        self.roots = [self._node(self._preflop_state(dealer)) for dealer in (0, 1)]
+        self.order.reverse()
+        self.legal = np.array(self.legal, dtype=bool)
+
+    def _preflop_state(self, dealer):
+        little, big = 1 - dealer, dealer
+        bets = [0, 0]
+        bets[little] = self.blind // 2
+        bets[big] = self.blind
+        # (little blind, street, chips from earlier streets, round bets, min_bet, raises, last raiser, index in
+        # acting order, raised this pass / chips added this orbit)
+        return (little, 0, (0, 0), tuple(bets), self.blind, 0, None, 0, False)
+
+    def _street_end(self, state):
+        little, street, base, bets = state[:4]
+        base = (base[0] + bets[0], base[1] + bets[1])
+        if street == 3:
+            return self._terminal(self.SHOWDOWN, None, base)
+        return self._node((little, street + 1, base, (0, 0), self.blind, 0, None, 0, False))
+
+    def _terminal(self, kind, player, contributions):
+        key = (kind, player, contributions)
+        if key not in self._memo:
+            self._memo[key] = self._add(kind, player, -1, -1, [-1, -1, -1], contributions)
+            self.order.append(self._memo[key])
+        return self._memo[key]
+
+    def _add(self, kind, player, infoset, street, children, contributions):
+        self.kind.append(kind)
+        self.player.append(player)
+        self.infoset.append(infoset)
+        self.street.append(street)
+        self.children.append(children)
+        self.contributions.append(contributions)
+        return len(self.kind) - 1
+
+    def _node(self, state):
+        little, street, base, bets, min_bet, raises, last, index, flag = state
+        acting = (little, 1 - little) if street == 0 else (0, 1)
+
+        # Skip players who do not act, and close the pass or round, until someone has a decision
+        while True:
+            if index == 2:
+                if not flag:
+                    return self._street_end(state)
+                index, flag = 0, False
+                state = (little, street, base, bets, min_bet, raises, last, index, flag)
+                continue
+            player = acting[index]
+            if player == last:
+                if street == 0:
+                    index += 1
+                    state = (little, street, base, bets, min_bet, raises, last, index, flag)
+                    continue
+                return self._street_end(state)
+            break
+
+        if state in self._memo:
+            return self._memo[state]
+
+        key = infoset_key("sb" if player == little else "bb", street, base[player], bets[player], min_bet)
+        if key not in self._key_index:
+            self._key_index[key] = len(self.keys)
+            self.keys.append(key)
+            self.legal.append([min_bet > bets[player], True, raises < MAX_RAISES])
+        node = self._add(self.DECISION, player, self._key_index[key], street, [-1, -1, -1], None)
+        self._memo[state] = node
+
+        children = self.children[node]
+        if min_bet > bets[player]:
+            folded = (base[0] + bets[0], base[1] + bets[1])
+            children[FOLD] = self._terminal(self.FOLDED, player, folded)
+
+        called = list(bets)
+        called[player] = min_bet
+        # Preflop only raises repeat the pass; after the flop any chips added keep the orbit going
+        changed = flag if street == 0 else flag or min_bet > bets[player]
+        children[CALL] = self._node((little, street, base, tuple(called), min_bet, raises, last, index + 1, changed))
+
+        if raises < MAX_RAISES:
+            raised = list(bets)
+            raised[player] = min_bet * 2
+            children[RAISE] = self._node((little, street, base, tuple(raised), min_bet * 2, raises + 1, player,
+                                          index + 1, True))
+
+        self.order.append(node)
+        return node
+
+
+class CFRTrainer:
+    """
+    Counterfactual regret minimization for heads-up play under the harness rules.
+
+    Every iteration deals a batch of hands and walks the betting tree once for the whole batch: a forward pass
+    spreads both players' reach probabilities down the tree, and a backward pass computes the payoffs and adds
+    every hand's regrets to its player's (information set, bucket) row with NumPy.
+    """
+
+    def __init__(self, bucketer=None, blind=20, batch_size=1000, seed=0):
+        """
+        Initialize a CFRTrainer.
+
+        Args:
+            bucketer (StrengthBucketer or BucketTable, optional): Card abstraction (default is a calibrated 8-bucket
+                StrengthBucketer). A BucketTable must cover all four streets and be saved to a file.
+            blind (int): The big blind.
+            batch_size (int): Hands dealt per iteration.
+            seed (int): Seed for the deals.
+        """
+        if bucketer is None:
+            bucketer = StrengthBucketer()
+            bucketer.calibrate(seed=seed)
+        self.bucketer = bucketer
+        self.tree = BettingTree(blind)
+        self.batch_size = batch_size
+        self.rng = np.random.default_rng(seed)
+        self.iterations = 0
+        shape = (len(self.tree.keys), bucketer.num_buckets, len(ACTIONS))
+        self.regrets = np.zeros(shape)
+        self.strategy_sum = np.zeros(shape)
+
+    def _deal(self):
+        """Deal a batch of hands and return both players' buckets per street and the showdown results."""
+        size = self.batch_size
+        deals = np.argsort(self.rng.random((size, len(FULL_DECK))), axis=1)[:, :9]
+        buckets = np.zeros((2, 4, size), dtype=np.intp)
+        results = np.zeros(size)
+        for n, deal in enumerate(deals):
+            cards = [FULL_DECK[i] for i in deal]
+            board = cards[4:]
+            for seat in (0, 1):
+                hole = cards[2 * seat:2 * seat + 2]
+                for street, count in enumerate((0, 3, 4, 5)):
+                    buckets[seat, street, n] = self.bucketer.bucket(hole, board[:count])
+            first, second = hand_strength(cards[0:2] + board), hand_strength(cards[2:4] + board)
+            results[n] = (first > second) - (first < second)
+        return buckets, results
+
+    def iterate(self):
+        """
+        Run one iteration.
+
+        Returns:
+            float: Seat 0's average payoff over the batch under the current strategies.
+        """
+        tree = self.tree
+        size = self.batch_size
+        buckets, results = self._deal()
+        num_nodes = len(tree.kind)
+        reach = np.zeros((num_nodes, 2, size))
+        strategy = {}
+        utility = np.zeros((num_nodes, size))
+        for root in tree.roots:
+            reach[root] = 1.0
+
+        # Forward: current strategy at every decision, and how likely each player is to get to every node
+        for node in tree.order:
+            if tree.kind[node] != BettingTree.DECISION:
+                continue
+            player, infoset = tree.player[node], tree.infoset[node]
+            legal = tree.legal[infoset]
+            positive = np.maximum(self.regrets[infoset][buckets[player, tree.street[node]]], 0) * legal
+            total = positive.sum(axis=1, keepdims=True)
+            current = np.where(total > 0, positive / np.where(total > 0, total, 1), legal / legal.sum())
+            strategy[node] = current
+            for action, child in enumerate(tree.children[node]):
+                if child >= 0:
+                    reach[child, player] += reach[node, player] * current[:, action]
+                    reach[child, 1 - player] += reach[node, 1 - player]
+
+        # Backward: payoffs for seat 0, and regret and average strategy updates
+        for node in reversed(tree.order):
+            kind = tree.kind[node]
+            if kind == BettingTree.FOLDED:
+                first, second = tree.contributions[node]
+                utility[node] = -first if tree.player[node] == 0 else second
+                continue
+            if kind == BettingTree.SHOWDOWN:
+                first, second = tree.contributions[node]
+                utility[node] = np.where(results > 0, second, np.where(results < 0, -first, (second - first) / 2))
+                continue
+
+            player, infoset = tree.player[node], tree.infoset[node]
+            current = strategy[node]
+            payoffs = np.zeros((size, len(ACTIONS)))
+            for action, child in enumerate(tree.children[node]):
+                if child >= 0:
+                    payoffs[:, action] = utility[child]
+            value = (current * payoffs).sum(axis=1)
+            utility[node] = value
+
+            sign = 1 if player == 0 else -1
+            regret = sign * (payoffs - value[:, None]) * reach[node, 1 - player][:, None]
+            weight = current * reach[node, player][:, None]
+            rows = buckets[player, tree.street[node]]
+            for action in np.flatnonzero(tree.legal[infoset]):
+                self.regrets[infoset, :, action] += np.bincount(rows, regret[:, action],
+                                                                minlength=self.bucketer.num_buckets)
+                self.strategy_sum[infoset, :, action] += np.bincount(rows, weight[:, action],
+                                                                     minlength=self.bucketer.num_buckets)
+
+        self.iterations += 1
+        return float(np.mean([utility[root].mean() for root in tree.roots]))
+
+    def train(self, iterations, checkpoint=None, every=100, log_every=10):
+        """
+        Run iterations, saving a checkpoint every so often and at the end.
+
+        Args:
+            iterations (int): Iterations to run.
+            checkpoint (str, optional): Path of the checkpoint file.
+            every (int): Iterations between checkpoints.
+            log_every (int): Iterations between progress lines (0 to stay quiet).
+        """
+        start = time.perf_counter()
+        for i in range(1, iterations + 1):
+            value = self.iterate()
+            if log_every and i % log_every == 0:
+                rate = i * self.batch_size / (time.perf_counter() - start)
+                print(f"Iteration {self.iterations}: seat 0 value {value:+.2f}, {rate:.0f} hands/s")
+            if checkpoint and i % every == 0:
+                self.save(checkpoint)
+        if checkpoint:
+            self.save(checkpoint)
+
+    def average_strategy(self):
+        """
+        Get the average strategy, the one that approaches equilibrium.
+
+        Returns:
+            numpy.ndarray: Action probabilities per (information set, bucket), uniform over the legal actions
+            where the row was never reached.
+        """
+        legal = self.tree.legal[:, None, :].astype(float)
+        total = self.strategy_sum.sum(axis=2, keepdims=True)
+        uniform = np.broadcast_to(legal / legal.sum(axis=2, keepdims=True), self.strategy_sum.shape)
+        return np.where(total > 0, self.strategy_sum / np.where(total > 0, total, 1), uniform)
+
+    def save(self, path):
+        """
+        Save the trainer to a compressed checkpoint with atomic_write.
+
+        Args:
+            path (str): Checkpoint path, conventionally ending in .npz.
+        """
+        with atomic_write(path) as file:
+            np.savez_compressed(
+                file,
+                keys=np.array(self.tree.keys),
+                strategy=self.average_strategy().astype(np.float32),
+                regrets=self.regrets,
+                strategy_sum=self.strategy_sum,
+                **_bucketer_arrays(self.bucketer),
+                blind=self.tree.blind,
+                iterations=self.iterations,
+            )
+
+    @classmethod
+    def load(cls, path, batch_size=1000, seed=0):
+        """
+        Resume a trainer from a checkpoint.
+
+        Args:
+            path (str): Checkpoint written by save().
+            batch_size (int): Hands dealt per iteration.
+            seed (int): Seed for the deals from here on.
+
+        Returns:
+            CFRTrainer: The trainer, with its regrets, average strategy and iteration count restored.
+        """
+        with np.load(path) as data:
+            trainer = cls(_load_bucketer(data), int(data["blind"]), batch_size, seed)
+            if list(data["keys"]) != trainer.tree.keys:
+                raise ValueError(f"{path} was trained on a different betting tree")
+            trainer.regrets = data["regrets"]
+            trainer.strategy_sum = data["strategy_sum"]
+            trainer.iterations = int(data["iterations"])
+        return trainer
+
+
+class CFRStrategy(Strategy):
+    """
+    Plays heads-up from a strategy table trained by CFRTrainer.
+
+    Each decision is a dictionary lookup of the information set and a bucket lookup of the cards. The strategy
+    keeps track of the hand itself (which blind it posted and what it put in on earlier streets), so every
+    player needs their own instance.
+    """
+
+    def __init__(self, path, seed=None):
+        """
+        Initialize a CFRStrategy.
+
+        Args:
+            path (str): Checkpoint written by CFRTrainer.save().
+            seed (int, optional): Seed for sampling actions.
+        """
+        with np.load(path) as data:
+            self.table = data["strategy"]
+            self.index = {key: i for i, key in enumerate(data["keys"].tolist())}
+            self.bucketer = _load_bucketer(data)
+            self.blind = int(data["blind"])
+        self.rng = random.Random(seed)
+        self._hole = None
+        self._street = 0
+        self._role = "bb"
+        self._start_chips = 0
+
+    def decide_action(self, player, community_cards, min_bet):
+        street = STREET_CARDS[len(community_cards)]
+        hole = tuple(player.cards)
+        if hole != self._hole or street < self._street:
+            # First decision of a new hand: only the blinds are in
+            self._hole = hole
+            self._role = "sb" if player.round_bet == self.blind // 2 else "bb"
+            self._start_chips = player.chips + player.round_bet
+        self._street = street
+
+        committed = self._start_chips - player.chips - player.round_bet
+        row = self.index.get(infoset_key(self._role, street, committed, player.round_bet, min_bet))
+        if row is None:
+            return "call"  # Outside the trained tree, e.g. short stacks
+
+        probabilities = self.table[row, self.bucketer.bucket(player.cards, community_cards)]
+        threshold = self.rng.random()
+        for action, probability in zip(ACTIONS, probabilities):
+            threshold -= probability
+            if threshold < 0:
+                return action
+        return "call"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train a heads-up CFR strategy for the harness rules.")
+    parser.add_argument("--iterations", type=int, default=1000, help="Iterations to run.")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Hands dealt per iteration.")
+    parser.add_argument("--buckets", type=int, default=8, help="Strength buckets per street.")
+    parser.add_argument("--bucket-table", metavar="PATH",
+                        help="Use lookup tables built by abstraction.py instead of strength quantile buckets.")
+    parser.add_argument("--blind", type=int, default=20, help="Big blind.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the deals.")
+    parser.add_argument("--checkpoint", default="cfr_strategy.npz", help="Checkpoint file.")
+    parser.add_argument("--checkpoint-every", type=int, default=100, help="Iterations between checkpoints.")
+    parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint file.")
+    args = parser.parse_args(argv)
+
+    if args.resume:
+        trainer = CFRTrainer.load(args.checkpoint, args.batch_size, args.seed)
+        print(f"Resuming from iteration {trainer.iterations}")
+    else:
+        if args.bucket_table:
+            bucketer = BucketTable.load(args.bucket_table, STREETS)
+        else:
+            bucketer = StrengthBucketer(args.buckets)
+            bucketer.calibrate(seed=args.seed)
+        trainer = CFRTrainer(bucketer, args.blind, args.batch_size, args.seed)
+    print(f"{len(trainer.tree.kind)} tree nodes, {len(trainer.tree.keys)} information sets")
+    trainer.train(args.iterations, args.checkpoint, args.checkpoint_every)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,15 +1,20 @@
+import contextlib
 import math
+import os
 import random
 from itertools import combinations
-from collections import OrderedDict
 
 RANKS = '2 3 4 5 6 7 8 9 10 J Q K A'.split()
 SUITS = 'Hearts Diamonds Clubs Spades'.split()
+CARD_VALUES = {'2': 2, '3': 3, '4': 4, '5': 5, '6': 6, '7': 7, '8': 8, '9': 9, '10': 10,
+               'Jack': 11, 'Queen': 12, 'King': 13, 'Ace': 14}
 
 
 class SidePot:
     """Represents a side pot in a poker game."""
 
+    __slots__ = ('chips', 'contributing_players')
+
     def __init__(self, chips, contributing_players):
         """
         Initialize a SidePot object.
@@ -23,32 +28,67 @@ class SidePot:
 
 
 class Pot:
-    """Represents the main pot in a poker game."""
+    """
+    Represents the main pot in a poker game.
+
+    Every chip put into the pot goes through commit(), which records the player's total commitment for the hand
+    in a ledger. Side pots are only derived from that ledger once the hand is over (see handle_side_pots).
+    """
+
+    __slots__ = ('chips', 'cards', 'contributions')
 
-    def __init__(self, cards = []):
-        """Initialize a Pot object."""
+    def __init__(self, cards=None):
+        """
+        Initialize a Pot object.
+
+        Args:
+            cards (list of tuple, optional): Community cards to start the pot with. The list is copied.
+        """
         self.chips = 0
-        self.cards = [] if cards == [] else cards
+        self.cards = [] if cards is None else list(cards)
+        self.contributions = {}  # Player -> total chips committed this hand
+
+    def commit(self, player, amount):
+        """
+        Add a player's chips to the pot and record them in the contribution ledger.
+
+        Args:
+            player (Player): The player putting chips in.
+            amount (int): The number of chips put in.
+
+        Raises:
+            ValueError: If amount is negative; chips only ever go into the pot until showdown.
+        """
+        if amount < 0:
+            raise ValueError(f"{player.name} cannot commit {amount} chips")
+        self.chips += amount
+        self.contributions[player] = self.contributions.get(player, 0) + amount
 
     def reset(self):
-        """Reset the pot to its initial state."""
+        """Reset the pot to its initial state, reusing the community card list and ledger."""
         self.chips = 0
-        self.cards = []
+        self.cards.clear()
+        self.contributions.clear()
+
+
+FULL_DECK = tuple((rank, suit)
+                  for suit in ['Spades', 'Hearts', 'Diamonds', 'Clubs']
+                  for rank in ['Ace', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'Jack', 'Queen', 'King'])
 
 
 class Deck:
     """Represents a deck of playing cards."""
 
+    __slots__ = ('cards',)
+
     def __init__(self):
         """Initialize a Deck object and populate it with a standard deck of cards."""
         self.cards = []
         self.reset()
 
     def reset(self):
-        """Reset the deck to its initial state with a standard deck of cards."""
-        suits = ['Spades', 'Hearts', 'Diamonds', 'Clubs']
-        ranks = ['Ace', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'Jack', 'Queen', 'King']
-        self.cards = [(rank, suit) for suit in suits for rank in ranks]
+        """Reset the deck to its initial state with a standard deck of cards, reusing the card list."""
+        self.cards[:] = FULL_DECK
 
     def shuffle(self):
         """Shuffle the deck to randomize card order."""
@@ -103,6 +143,7 @@ def hand_rank(hand):
     """
     ranks = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'Jack', 'Queen', 'King', 'Ace']
     suits = ['Spades', 'Hearts', 'Diamonds', 'Clubs']
+    wheel = [12, 3, 2, 1, 0]  # Ace, 5, 4, 3, 2 sorted high to low: the Ace plays low in a five high straight
 
     rank_count = {rank: 0 for rank in ranks}
     suit_count = {suit: 0 for suit in suits}
@@ -126,7 +167,7 @@ def hand_rank(hand):
         if suit_count[suit] == 5:
             suited_cards = [card for card in hand if card[1] == suit]
             suited_ranks = sorted([ranks.index(card[0]) for card in suited_cards], reverse=True)
-            if len(suited_ranks) == 5 and max(suited_ranks) - min(suited_ranks) == 4:
+            if len(suited_ranks) == 5 and (max(suited_ranks) - min(suited_ranks) == 4 or suited_ranks == wheel):
                 return (9, suited_cards)
 
     for rank, count in rank_count.items():
@@ -150,7 +191,7 @@ def hand_rank(hand):
             return (6, suited_cards)
 
     ranks_in_hand = sorted([ranks.index(card[0]) for card in hand], reverse=True)
-    if len(set(ranks_in_hand)) == 5 and max(ranks_in_hand) - min(ranks_in_hand) == 4:
+    if len(set(ranks_in_hand)) == 5 and (max(ranks_in_hand) - min(ranks_in_hand) == 4 or ranks_in_hand == wheel):
         return (5, hand)
 
     for rank, count in rank_count.items():
@@ -178,6 +219,82 @@ def hand_rank(hand):
     return (1, sorted_hand)
 
 
+def _straight_high(values):
+    """
+    Find the highest straight in a set of card values.
+
+    Args:
+        values (set of int): Card values from 2 to 14.
+
+    Returns:
+        int: The value of the straight's top card (5 for the wheel), or 0 if there is no straight.
+    """
+    for high in range(14, 5, -1):
+        if high in values and high - 1 in values and high - 2 in values and high - 3 in values and high - 4 in values:
+            return high
+    if 14 in values and 2 in values and 3 in values and 4 in values and 5 in values:
+        return 5
+    return 0
+
+
+def hand_strength(cards):
+    """
+    Compute a comparable strength key for the best five-card hand in a set of cards.
+
+    Unlike hand_rank, this evaluates five to seven cards in one pass without enumerating combinations, and the
+    key orders hands completely: a higher key is a better hand and equal keys split the pot.
+
+    Args:
+        cards (list of tuple): Five to seven card tuples, e.g. hole cards plus community cards.
+
+    Returns:
+        tuple: The hand rank (integer, same scale as hand_rank) followed by the card values that break ties.
+    """
+    counts = {}
+    suited = {}
+    for rank, suit in cards:
+        value = CARD_VALUES[rank]
+        counts[value] = counts.get(value, 0) + 1
+        suited.setdefault(suit, []).append(value)
+
+    for values in suited.values():
+        if len(values) >= 5:
+            high = _straight_high(set(values))
+            if high == 14:
+                return (10, 14)
+            if high:
+                return (9, high)
+            flush = sorted(values, reverse=True)[:5]
+            break
+    else:
+        flush = None
+
+    # Card values grouped by how many times they appear, highest count then highest value first
+    groups = sorted(counts.items(), key=lambda item: (item[1], item[0]), reverse=True)
+    top_value, top_count = groups[0]
+
+    if top_count == 4:
+        return (8, top_value, max(value for value in counts if value != top_value))
+    if top_count == 3 and groups[1][1] >= 2:
+        return (7, top_value, groups[1][0])
+    if flush:
+        return (6,) + tuple(flush)
+
+    high = _straight_high(counts.keys())
+    if high:
+        return (5, high)
+
+    singles = sorted((value for value, count in groups if count == 1), reverse=True)
+    if top_count == 3:
+        return (4, top_value) + tuple(singles[:2])
+    if top_count == 2 and groups[1][1] == 2:
+        kicker = max(value for value in counts if value != top_value and value != groups[1][0])
+        return (3, top_value, groups[1][0], kicker)
+    if top_count == 2:
+        return (2, top_value) + tuple(singles[:3])
+    return (1,) + tuple(singles[:5])
+
+
 def preflop_hand_rank(hand):
     """
     Evaluate the rank of a preflop poker hand.
@@ -221,70 +338,91 @@ def preflop(players, dealer, deck, pot, blind):
     Returns:
         list of Player: The remaining active players after the preflop round.
     """
-    players = [player for player in players if player.chips >= blind // 2]
+    return act(preflop_steps(players, dealer, deck, pot, blind))
 
-    little = players[(dealer + 1) % len(players)]
-    big = players[(dealer + 2) % len(players)]
 
-    pot.chips += blinds(big, little, blind)
-    players = players[(dealer + 1):] + players[:(dealer + 1)]
+def preflop_steps(players, dealer, deck, pot, blind):
+    """
+    The preflop betting round as a generator, for engines that get actions some other way (see act).
 
-    for i in range(2):
-        for p in players:
-            p.cards.append(deck.draw())
+    Yields (player, community cards, min_bet) for every decision and must be sent the player's action. Returns
+    what preflop returns.
+    """
+    # Players who cannot cover the little blind sit this hand out
+    for player in players:
+        if player.chips < blind // 2:
+            player.fold = True
+    players = [player for player in players if not player.fold]
+    if len(players) < 2:
+        return 1
+
+    try:
+        little = players[(dealer + 1) % len(players)]
+        big = players[(dealer + 2) % len(players)]
+
+        blinds(big, little, blind)
+        pot.commit(little, little.round_bet)
+        pot.commit(big, big.round_bet)
+        players = players[(dealer + 1):] + players[:(dealer + 1)]
+
+        for i in range(2):
+            for p in players:
+                p.cards.append(deck.draw())
+
+        min_bet = blind
+        raise_count = 0
+        last_raiser = None
+
+        while True:
+            all_called_or_folded = True
+            for player in players:
+                if player.fold or player == last_raiser or player.chips == 0:
+                    continue
+                player_action = yield player, pot.cards, min_bet
+                if player_action == "fold":
+                    player.fold = True
+                    if sum(not p.fold for p in players) == 1:
+                        print("all fold")
+                        return 1
+                elif player_action == "call" or player_action == "raise" and raise_count >= 3:
+                    # Once the raises are capped a raise is a call, as in betting_round
+                    call_amount = min(player.chips, min_bet - player.round_bet)
+                    pot.commit(player, call_amount)
+                    player.chips -= call_amount
+                    player.round_bet += call_amount
+                elif player_action == "raise":
+                    raise_amount = min(player.chips, min_bet * 2 - player.round_bet)
+                    pot.commit(player, raise_amount)
+                    player.chips -= raise_amount
+                    player.round_bet += raise_amount
+                    # A short stack that cannot reach the bet is all-in and must not lower it
+                    if player.round_bet > min_bet:
+                        min_bet = player.round_bet
+                        raise_count += 1
+                        all_called_or_folded = False
+                        last_raiser = player
+                elif player_action == "all-in":
+                    all_in_amount = player.chips
+                    pot.commit(player, all_in_amount)
+                    player.round_bet += all_in_amount
+                    player.chips = 0
+                    if player.round_bet > min_bet:
+                        min_bet = player.round_bet
+                        raise_count += 1
+                        all_called_or_folded = False
+                        last_raiser = player
+                else:
+                    print("Invalid Action")
+                    return
 
-    min_bet = blind
-    raise_count = 0
-    last_raiser = None
+            if all_called_or_folded:
+                break
 
-    while True:
-        all_called_or_folded = True
+        return players
+    finally:
+        # Reset the round bets for the flop, however the round ended
         for player in players:
-            if player.fold or player == last_raiser or player.chips == 0:
-                continue
-            player_action = player.choose_action(pot.cards, min_bet)
-            if player_action == "fold":
-                player.fold = True
-                if all(p.fold for p in players if p != player):
-                    print("all fold")
-                    return 1
-            elif player_action == "call":
-                call_amount = min(player.chips, min_bet - player.round_bet)
-                pot.chips += call_amount
-                player.chips -= call_amount
-                player.round_bet += call_amount
-                if player.chips == 0:
-                    handle_side_pots(players, [player for player in players if not player.fold], pot)
-            elif player_action == "raise" and raise_count < 3:
-                raise_amount = min(player.chips, min_bet * 2 - player.round_bet)
-                pot.chips += raise_amount
-                player.chips -= raise_amount
-                player.round_bet += raise_amount
-                min_bet = player.round_bet
-                raise_count += 1
-                all_called_or_folded = False
-                last_raiser = player
-                if player.chips == 0:
-                    handle_side_pots(players, [player for player in players if not player.fold], pot)
-            elif player_action == "all-in":
-                all_in_amount = player.chips
-                pot.chips += all_in_amount
-                player.round_bet += all_in_amount
-                player.chips = 0
-                if player.round_bet > min_bet:
-                    min_bet = player.round_bet
-                    raise_count += 1
-                    all_called_or_folded = False
-                    last_raiser = player
-                handle_side_pots(players, [player for player in players if not player.fold], pot)
-            else:
-                print("Invalid Action")
-                return
-
-        if all_called_or_folded:
-            break
-
-    return players
+            player.round_bet = 0
 
 
 def betting_round(players, pot, deck, min_bet, round_name):
@@ -301,6 +439,16 @@ def betting_round(players, pot, deck, min_bet, round_name):
     Returns:
         None
     """
+    return act(betting_round_steps(players, pot, deck, min_bet, round_name))
+
+
+def betting_round_steps(players, pot, deck, min_bet, round_name):
+    """
+    A betting round (flop, turn, or river) as a generator, for engines that get actions some other way (see act).
+
+    Yields (player, community cards, min_bet) for every decision and must be sent the player's action. Returns
+    what betting_round returns.
+    """
     if round_name == "flop":
         for _ in range(3):  # Deal 3 cards for the flop
             pot.cards.append(deck.draw())
@@ -313,39 +461,60 @@ def betting_round(players, pot, deck, min_bet, round_name):
     raise_count = 0
     last_raiser = None
 
-    # Betting loop
-    while True:
-        old_pot = pot.chips
-        active_players = [player for player in players if not player.fold and player.chips > 0]
-
-        print(len(active_players))
-
-        for player in active_players:
-            if player == last_raiser:
-                # Reset round bets and return if the cycle of betting is complete
-                for player in active_players:
-                    player.round_bet = 0
-                return
-
-            player_action = player.choose_action(pot.cards, min_bet)
-            if player_action == "fold":
-                player.fold = True
-                print(f"Player {player.name} folded!")
-                if all(p.fold for p in players if p != player):
-                    print("all fold")
-                    return 1  # End the round if everyone else has folded
-            elif player_action == "call":
-                call_amount = min(player.chips, min_bet - player.round_bet)
-                pot.chips += call_amount
-                player.chips -= call_amount
-                player.round_bet += call_amount
-                if player.chips == 0:
-                    handle_side_pots(players, active_players, pot)
-            elif player_action == "raise" and raise_count < 3:
-                proposed_raise_amount = min_bet * 2 - player.round_bet
-                if player.chips < proposed_raise_amount:
+    try:
+        # Betting loop
+        while True:
+            old_pot = pot.chips
+            active_players = [player for player in players if not player.fold and player.chips > 0]
+
+            print(len(active_players))
+
+            for player in active_players:
+                if player == last_raiser:
+                    # The cycle of betting is complete
+                    return
+
+                player_action = yield player, pot.cards, min_bet
+                if player_action == "fold":
+                    player.fold = True
+                    print(f"Player {player.name} folded!")
+                    if sum(not p.fold for p in players) == 1:
+                        print("all fold")
+                        return 1  # End the round if everyone else has folded
+                elif player_action == "call":
+                    call_amount = min(player.chips, min_bet - player.round_bet)
+                    pot.commit(player, call_amount)
+                    player.chips -= call_amount
+                    player.round_bet += call_amount
+                elif player_action == "raise" and raise_count < 3:
+                    proposed_raise_amount = min_bet * 2 - player.round_bet
+                    if player.chips < proposed_raise_amount:
+                        all_in_amount = player.chips
+                        pot.commit(player, all_in_amount)
+                        player.round_bet += all_in_amount
+                        player.chips = 0
+                        if player.round_bet > min_bet:
+                            min_bet = player.round_bet
+                            raise_count += 1
+                        last_raiser = player
+                        print(f"{player.name} goes all-in with {all_in_amount} chips.")
+                    else:
+                        raise_amount = proposed_raise_amount
+                        pot.commit(player, raise_amount)
+                        player.chips -= raise_amount
+                        player.round_bet += raise_amount
+                        min_bet = player.round_bet
+                        raise_count += 1
+                        last_raiser = player
+                        print(f"{player.name} raises to {raise_amount} chips.")
+                elif player_action == "raise":  # Raises are capped, so this is a call
+                    call_amount = min(player.chips, min_bet - player.round_bet)
+                    pot.commit(player, call_amount)
+                    player.chips -= call_amount
+                    player.round_bet += call_amount
+                elif player_action == "all-in":
                     all_in_amount = player.chips
-                    pot.chips += all_in_amount
+                    pot.commit(player, all_in_amount)
                     player.round_bet += all_in_amount
                     player.chips = 0
                     if player.round_bet > min_bet:
@@ -353,188 +522,260 @@ def betting_round(players, pot, deck, min_bet, round_name):
                         raise_count += 1
                     last_raiser = player
                     print(f"{player.name} goes all-in with {all_in_amount} chips.")
-                    handle_side_pots(players, active_players, pot)
                 else:
-                    raise_amount = proposed_raise_amount
-                    pot.chips += raise_amount
-                    player.chips -= raise_amount
-                    player.round_bet += raise_amount
-                    min_bet = player.round_bet
-                    raise_count += 1
-                    last_raiser = player
-                    print(f"{player.name} raises to {raise_amount} chips.")
-            elif player_action == "raise" and raise_count == 3:
-                call_amount = min(player.chips, min_bet - player.round_bet)
-                pot.chips += call_amount
-                player.chips -= call_amount
-                player.round_bet += call_amount
-            elif player_action == "all-in":
-                all_in_amount = player.chips
-                pot.chips += all_in_amount
-                player.round_bet += all_in_amount
-                player.chips = 0
-                if player.round_bet > min_bet:
-                    min_bet = player.round_bet
-                    raise_count += 1
-                last_raiser = player
-                print(f"{player.name} goes all-in with {all_in_amount} chips.")
-                handle_side_pots(players, active_players, pot)
-            else:
-                print("Invalid Action!")
-                return
-
-        # End the betting round if everyone has acted and there is no new raise
-        if old_pot == pot.chips:
-            break
+                    print("Invalid Action!")
+                    return
+
+            # End the betting round if everyone has acted and there is no new raise
+            if old_pot == pot.chips:
+                break
+    finally:
+        # Reset the round bets for the next betting round, however the round ended
+        for player in players:
+            player.round_bet = 0
 
-    # Reset the round bets for the next betting round
-    for player in players:
-        player.round_bet = 0
+
+def act(steps):
+    """
+    Drive a generator of decisions, asking each player's strategy for their actions.
+
+    Args:
+        steps (generator): From hand_steps, preflop_steps or betting_round_steps.
+
+    Returns:
+        What the generator returns.
+    """
+    try:
+        player, community_cards, min_bet = next(steps)
+        while True:
+            player, community_cards, min_bet = steps.send(player.choose_action(community_cards, min_bet))
+    except StopIteration as stop:
+        return stop.value
 
 
-def handle_side_pots(all_players, active_players, main_pot):
+def handle_side_pots(players, pot):
     """
-    Handle side pots in the current hand.
+    Split the pot into layered side pots using the pot's contribution ledger.
+
+    This is computed once, when the hand is over. Each layer holds the chips committed between two consecutive
+    commitment levels and is contested by the players who are still in the hand and committed at least that much.
+    Layers contested by the same players are merged, and chips from a layer nobody live can contest (a folded
+    player out-committed everyone left) join the layer below. If no layer has a live player, because everyone
+    who put chips in folded to players who never had to, the whole pot goes to the players still in the hand.
 
     Args:
-        all_players (list of Player): List of all players in the current hand.
-        active_players (list of Player): List of active players in the current hand.
-        main_pot (Pot): The main pot.
+        players (list of Player): List of players in the current hand, in seat order.
+        pot (Pot): The main pot.
 
     Returns:
-        int: The chips in the last side pot (if any) or the chips in the main pot.
+        list of SidePot: The side pots from the main pot upwards.
     """
-    # Sort active players based on their round bets in descending order
-    active_players.sort(key=lambda x: x.round_bet, reverse=True)
+    seat = {player: i for i, player in enumerate(players)}
+    ledger = sorted(pot.contributions.items(), key=lambda item: (item[1], seat.get(item[0], len(seat))))
 
-    # Initialize an empty list to store side pots
     side_pots = []
+    level = 0
+    for i, (player, amount) in enumerate(ledger):
+        if amount == level:
+            continue
+        chips = (amount - level) * (len(ledger) - i)
+        level = amount
 
-    # Initialize the current pot with the main pot
-    current_pot = main_pot
+        eligible = [p for p, _ in ledger[i:] if not p.fold]
+        if side_pots and (not eligible or eligible == side_pots[-1].contributing_players):
+            side_pots[-1].chips += chips
+        elif eligible:
+            side_pots.append(SidePot(chips, eligible))
 
-    # Iterate through the active players
-    for i in range(len(active_players)):
-        player = active_players[i]
+    if not side_pots and pot.chips:
+        live = [player for player in players if not player.fold]
+        if live:
+            side_pots.append(SidePot(pot.chips, live))
 
-        # Check if the player's round bet is less than the chips in the current pot
-        if player.round_bet < current_pot.chips:
-            # Create a new side pot and set its chips based on the player's round bet and the number of remaining players
-            side_pot = Pot(cards = main_pot.cards)
-            side_pot.chips = player.round_bet * (len(active_players) - i)
+    return side_pots
 
-            # Update the chips in the current pot by subtracting the chips in the side pot
-            current_pot.chips -= side_pot.chips
 
-            # Add the side pot to the list of side pots
-            side_pots.append(side_pot)
-        else:
-            # If the player's round bet is greater than or equal to the chips in the current pot, break out of the loop
-            break
-
-    # # Move the cards from the current pot to the main pot and reset the current pot
-    # main_pot.cards.extend(current_pot.cards)
-    # main_pot.reset()
+def showdown(players, pot):
+    """
+    Determine the winner(s) of the current hand during the showdown.
 
-    # # Distribute the cards from the current pot to each side pot
-    # for side_pot in side_pots:
-    #     side_pot.cards.extend(current_pot.cards.copy())
+    Every player still contesting a side pot gets one hand_strength key, and the players are ranked once by it.
+    Each side pot from handle_side_pots goes to the highest ranked of its eligible players; equal keys split the
+    pot, with odd chips handed out one at a time to the winners in seat order.
 
-    # Print information about the side pots
-    print("\nSide Pots:")
-    for i, side_pot in enumerate(side_pots):
-        print(f"Side Pot {i + 1}: {side_pot.chips} chips - Cards: {side_pot.cards}")
+    Args:
+        players (list of Player): List of players in the current hand, in seat order.
+        pot (Pot): The main pot.
 
-    # Reset the round bets for all players
-    for player in all_players:
-        player.round_bet = 0
+    Returns:
+        None
+    """
+    side_pots = handle_side_pots(players, pot)
+
+    strengths = {}
+    for side_pot in side_pots:
+        if len(side_pot.contributing_players) > 1:
+            for player in side_pot.contributing_players:
+                if player not in strengths:
+                    strengths[player] = hand_strength(player.cards + pot.cards)
+    ranked = sorted(strengths, key=strengths.get, reverse=True)
+    seat = {player: i for i, player in enumerate(players)}
+
+    for side_pot in side_pots:
+        if len(side_pot.contributing_players) == 1:
+            winners = side_pot.contributing_players
+        else:
+            eligible = set(side_pot.contributing_players)
+            winners = []
+            for player in ranked:
+                if player in eligible:
+                    if winners and strengths[player] != strengths[winners[0]]:
+                        break
+                    winners.append(player)
+            winners.sort(key=seat.get)
+
+        share, odd_chips = divmod(side_pot.chips, len(winners))
+        for i, player in enumerate(winners):
+            won = share + 1 if i < odd_chips else share
+            player.chips += won
+            print(player.name + " won " + str(won) + " chips!")
 
-    # Return the chips in the last side pot (if any) or the chips in the main pot
-    return side_pots[-1].chips if side_pots else main_pot.chips
+    pot.reset()
 
 
-def showdown(players, pot):
+def play_hand(players, dealer, deck, pot, blind):
     """
-    Determine the winner(s) of the current hand during the showdown.
+    Plays out a single hand of poker.
 
     Args:
-        players (list of Player): List of players in the current hand.
+        players (list of Player): List of players at the table, in seat order.
+        dealer (int): Index of the dealer position among players.
+        deck (Deck): The shuffled deck of cards for the hand.
         pot (Pot): The main pot.
+        blind (int): The blind amount for the current hand.
 
     Returns:
         None
     """
-    best_hands = []
+    act(hand_steps(players, dealer, deck, pot, blind))
 
-    print(players[0].cards)
 
-    for player in players:
-        if not player.fold:
-            all_hands = list(combinations(player.cards + pot.cards, 5))
-            best_hand = max(all_hands, key=hand_rank)
-            best_hand = hand_rank(best_hand)
+def hand_steps(players, dealer, deck, pot, blind):
+    """
+    A whole hand as a generator, for engines that get actions some other way (see act).
 
-            best_hands.append((player, best_hand))
-    # print(best_hands)
-    best_hands = sorted(best_hands, key=lambda x: x[1][0], reverse=True)
-    best_hands = [item for item in best_hands if item[1][0] >= best_hands[0][1][0]]
+    Yields (player, community cards, min_bet) for every decision of every betting round and must be sent the
+    player's action.
+    """
+    print("\nPreflop")
+    output = yield from preflop_steps(players, dealer, deck, pot, blind)
 
-    print(best_hands)
+    for round_name in ["flop", "turn", "river"]:
+        if output == 1:
+            break
+        print("\n" + round_name.capitalize())
+        output = yield from betting_round_steps(players, pot, deck, blind, round_name)
 
-    if len(best_hands) == 1:
-        best_hands[0][0].chips += pot.chips
-        print("\n" + best_hands[0][0].name + " won " + str(pot.chips) + " chips!")
-    else:
-        player_dict = {}
-        for player in best_hands:
-            player_dict[player[0]] = []
-            temp = []
-            for card in player[1][1]:
-                if card[0] == "Ace":
-                    val = 14
-                elif card[0] == "King":
-                    val = 13
-                elif card[0] == "Queen":
-                    val = 12
-                elif card[0] == "Jack":
-                    val = 11
-                else:
-                    val = int(card[0])
-                temp.append(val)
-            player_dict[player[0]] = temp
+    showdown(players, pot)
 
-        print(player_dict)
+    round_end(players)
 
-        for key, value in player_dict.items():
-            count_dict = {}  # Initialize an empty dictionary
 
-            for item in value:
-                if item in count_dict:
-                    count_dict[item] += 1  # If the item is already in the dictionary, increment its count
-                else:
-                    count_dict[item] = 1  # If the item is not in the dictionary, initialize its count to 1
-            player_dict[key] = OrderedDict(sorted(count_dict.items(), key=lambda x: (x[1], x[0]), reverse=True))
+def play_match(players, num_hands, blind):
+    """
+    Plays hands until num_hands have been played or one player has all the chips.
+
+    Args:
+        players (list of Player): List of players at the table, in seat order.
+        num_hands (int): The maximum number of hands to play.
+        blind (int): The blind amount for every hand.
+
+    Returns:
+        int: The number of hands played.
+    """
+    pot = Pot()
+    deck = Deck()
+    current_hand = 1
+    while current_hand <= num_hands and not game_over(players):
+        play_next_hand(players, current_hand, blind, pot, deck)
+
+        current_hand += 1
+        # Optional: Increase blinds at intervals or based on conditions
+        # Optional: Check and remove any players out of chips from the player list
 
-            # print(player_dict[key])
+    return current_hand - 1
 
-        print(player_dict)
 
-        maximum = list(list(player_dict.values())[0])
-        equal = []
-        for key, value in player_dict.items():
-            value = list(value)
-            if value > maximum:
-                maximum = value
-                equal = [key]
-            elif value == maximum:
-                equal.append(key)
 
-        print("\n")
+def play_next_hand(players, hand_number, blind, pot, deck):
+    """
+    Reshuffle the deck and play one hand of a match, with the dealer position rotating each hand.
+
+    The pot and deck are created once per match and reset here, so a hand allocates no new table state.
+
+    Args:
+        players (list of Player): List of players at the table, in seat order.
+        hand_number (int): The number of the hand in the match, starting at 1.
+        blind (int): The blind amount for the hand.
+        pot (Pot): The match's pot, emptied before the hand.
+        deck (Deck): The match's deck, refilled and shuffled before the hand.
+
+    Returns:
+        None
+    """
+    act(next_hand_steps(players, hand_number, blind, pot, deck))
 
-        for player in equal:
-            player.chips += int(pot.chips / len(equal))
-            print(player.name + " won " + str(int(pot.chips / len(equal))) + " chips!")
 
-        print("\n")
+def next_hand_steps(players, hand_number, blind, pot, deck):
+    """
+    play_next_hand as a generator, for engines that get actions some other way (see act).
 
+    Yields (player, community cards, min_bet) for every decision and must be sent the player's action.
+    """
+    print(f"Hand {hand_number} begins.")
     pot.reset()
+    deck.reset()
+    deck.shuffle()
+
+    # Assign dealer position that rotates each hand
+    dealer = (hand_number - 1) % len(players)  # This will rotate the dealer position
+
+    yield from hand_steps(players, dealer, deck, pot, blind)
+
+
+def round_end(players):
+    """Reset player states for the next hand."""
+    for player in players:
+        player.reset()  # Ensure this method resets only hand-specific states, not chip counts
+        print(f"{player.name}: {player.chips} chips")
+
+
+def game_over(players):
+    """Returns True if the game is over (i.e., only one player left with all chips)."""
+    return sum(player.chips > 0 for player in players) <= 1
+
+
+@contextlib.contextmanager
+def atomic_write(path, mode="wb", opener=open):
+    """
+    Open a temporary file next to path and move it over path once the block finishes.
+
+    An interrupted write leaves any previous file at path intact; on an error the temporary file is removed.
+
+    Args:
+        path (str): The file to write.
+        mode (str): Mode to open the temporary file with.
+        opener (callable): Opens the temporary file, e.g. gzip.open for compressed files.
+
+    Yields:
+        file: The open temporary file.
+    """
+    temporary = path + ".tmp"
+    try:
+        with opener(temporary, mode) as file:
+            yield file
+        os.replace(temporary, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temporary)
+        raise
@@ -1,4 +1,9 @@
+import inspect
+
+
 class Player:
+    __slots__ = ('name', 'chips', 'action', 'fold', 'round_bet', 'cards', 'strategy')
+
     def __init__(self, n, strategy=None, chips=2000):
         """
         Initialize a Player object.
@@ -19,11 +24,13 @@ class Player:
     def reset(self):
         """
         Reset the player's round-specific attributes to their initial state.
+
+        The hole card list is emptied in place rather than reallocated.
         """
         self.action = ""
         self.fold = False
         self.round_bet = 0
-        self.cards = []
+        self.cards.clear()
     
     def hard_reset(self, n, strategy=None, chips=2000):
         """
@@ -39,7 +46,7 @@ class Player:
         self.action = ""  # The player's chosen action in the current round
         self.fold = False  # Flag indicating whether the player has folded
         self.round_bet = 0  # The amount of chips the player has bet in the current round
-        self.cards = []  # The player's hole cards
+        self.cards.clear()  # The player's hole cards
         self.strategy = strategy  # The strategy used by the player for decision-making
 
 
@@ -57,3 +64,20 @@ class Player:
         action = self.strategy.decide_action(self, community_cards, min_bet)
         self.action = action
         return action
+
+    async def achoose_action(self, community_cards, min_bet):
+        """
+        Choose an action like choose_action, awaiting the strategy if its decide_action is a coroutine.
+
+        Args:
+            community_cards (list of tuple): The community cards that are visible to all players.
+            min_bet (int): The minimum bet amount for the current round.
+
+        Returns:
+            str: The chosen action for the player (e.g., "fold," "call," "raise," or "all-in").
+        """
+        action = self.strategy.decide_action(self, community_cards, min_bet)
+        if inspect.isawaitable(action):
+            action = await action
+        self.action = action
+        return action
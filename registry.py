@@ -0,0 +1,217 @@
+import argparse
+import ast
+import importlib
+import json
+import os
+import sys
+import time
+
+from harness import atomic_write
+
+INDEX_VERSION = 1
+INDEX_FILE = ".strategy_index.json"
+
+
+def _base_name(node):
+    """Get the name a base class is referred to by, e.g. Strategy for both Strategy and strategy.Strategy."""
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return None
+
+
+def scan_file(path):
+    """
+    List the classes defined at the top level of a module without importing it.
+
+    Args:
+        path (str): Path of the Python file.
+
+    Returns:
+        list of list: [class name, [base class names]] for each class.
+    """
+    with open(path, "rb") as file:
+        tree = ast.parse(file.read(), path)
+    return [[node.name, [name for name in map(_base_name, node.bases) if name]]
+            for node in tree.body if isinstance(node, ast.ClassDef)]
+
+
+class StrategyRegistry:
+    """
+    Finds Strategy subclasses by name and imports them only when they are seated.
+
+    Modules in the directory are scanned with ast rather than imported, so a bot that is slow or broken at import
+    time only costs anything when it plays. A class counts as a strategy when it derives from Strategy, directly
+    or through other strategies found in the scan. The scan is cached in an index file next to the modules and
+    only files whose modification time or size changed are parsed again. A config file can add strategies that
+    live elsewhere, as a JSON object mapping names to "module:Class".
+    """
+
+    def __init__(self, directory=".", config=None, index=INDEX_FILE):
+        """
+        Initialize a StrategyRegistry and build its index.
+
+        Args:
+            directory (str): Directory holding the strategy modules; it is put on sys.path for imports.
+            config (str, optional): JSON file mapping strategy names to "module:Class".
+            index (str, optional): Index cache file, relative to directory (None to not cache).
+        """
+        self.directory = os.path.abspath(directory)
+        self.index_path = os.path.join(self.directory, index) if index else None
+        self.strategies = {}  # Strategy name -> "module:Class"
+        self.ambiguous = {}  # Class name defined in more than one module -> its "module:Class" names
+        self.import_times = {}  # "module:Class" -> seconds spent importing its module
+        self.errors = {}  # File that could not be parsed -> error
+        self.discover()
+        if config:
+            with open(config) as file:
+                self.strategies.update(json.load(file))
+
+    def discover(self):
+        """Scan the directory for strategies, reusing the cached scan of unchanged files."""
+        cached = {}
+        if self.index_path and os.path.exists(self.index_path):
+            try:
+                with open(self.index_path) as file:
+                    index = json.load(file)
+                if index.get("version") == INDEX_VERSION:
+                    cached = index["files"]
+            except (OSError, ValueError, KeyError):
+                cached = {}
+
+        files = {}
+        for filename in sorted(os.listdir(self.directory)):
+            if not filename.endswith(".py"):
+                continue
+            stat = os.stat(os.path.join(self.directory, filename))
+            entry = cached.get(filename)
+            if entry is None or entry["mtime"] != stat.st_mtime_ns or entry["size"] != stat.st_size:
+                try:
+                    classes = scan_file(os.path.join(self.directory, filename))
+                except (SyntaxError, ValueError) as error:
+                    self.errors[filename] = str(error)
+                    continue
+                entry = {"mtime": stat.st_mtime_ns, "size": stat.st_size, "classes": classes}
+            files[filename] = entry
+
+        if self.index_path and files != cached:
+            self._save_index(files)
+        self._resolve(files)
+
+    def _save_index(self, files):
+        """Write the index file."""
+        try:
+            with atomic_write(self.index_path, "w") as file:
+                json.dump({"version": INDEX_VERSION, "files": files}, file)
+        except OSError:
+            pass  # A read-only directory just means scanning again next time
+
+    def _resolve(self, files):
+        """Find the classes deriving from Strategy, following bases across modules."""
+        strategy_names = {"Strategy"}
+        found = {}
+        changed = True
+        while changed:
+            changed = False
+            for filename, entry in files.items():
+                module = filename[:-3]
+                for name, bases in entry["classes"]:
+                    target = f"{module}:{name}"
+                    if target not in found and strategy_names.intersection(bases):
+                        found[target] = name
+                        strategy_names.add(name)
+                        changed = True
+
+        by_name = {}
+        for target, name in found.items():
+            by_name.setdefault(name, []).append(target)
+        for name, targets in by_name.items():
+            if len(targets) == 1:
+                self.strategies[name] = targets[0]
+            else:
+                self.ambiguous[name] = targets
+
+    def names(self):
+        """
+        List the strategies that can be seated.
+
+        Returns:
+            list of str: Strategy names, plus "module:Class" for class names defined in several modules.
+        """
+        return sorted(self.strategies) + sorted(target for targets in self.ambiguous.values() for target in targets)
+
+    def load(self, name):
+        """
+        Import a strategy class.
+
+        Args:
+            name (str): A strategy name from names(), or "module:Class".
+
+        Returns:
+            type: The strategy class.
+        """
+        if name in self.ambiguous:
+            raise LookupError(f"{name} is defined in several modules, use one of {self.ambiguous[name]}")
+        target = self.strategies.get(name, name)
+        if ":" not in target:
+            raise LookupError(f"No strategy named {name}; known strategies are {self.names()}")
+        module_name, class_name = target.split(":", 1)
+
+        if self.directory not in sys.path:
+            sys.path.insert(0, self.directory)
+        if module_name not in sys.modules:
+            start = time.perf_counter()
+            importlib.import_module(module_name)
+            self.import_times[target] = time.perf_counter() - start
+        return getattr(sys.modules[module_name], class_name)
+
+    def create(self, name, *args, **kwargs):
+        """
+        Import a strategy class and create an instance of it.
+
+        Args:
+            name (str): A strategy name from names(), or "module:Class".
+            *args, **kwargs: Passed to the strategy's constructor.
+
+        Returns:
+            Strategy: The new strategy.
+        """
+        return self.load(name)(*args, **kwargs)
+
+    def report(self):
+        """Print the time spent importing each strategy module, slowest first."""
+        for target, seconds in sorted(self.import_times.items(), key=lambda item: -item[1]):
+            print(f"{target}: imported in {seconds * 1000:.1f}ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="List the strategies that can be seated.")
+    parser.add_argument("--directory", default=os.path.dirname(os.path.abspath(__file__)),
+                        help="Directory holding the strategy modules (default is the one registry.py is in).")
+    parser.add_argument("--config", help="JSON file mapping strategy names to module:Class.")
+    parser.add_argument("--import", dest="load", action="store_true", help="Import each one and report the time.")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    registry = StrategyRegistry(args.directory, args.config)
+    print(f"Found {len(registry.names())} strategies in {(time.perf_counter() - start) * 1000:.1f}ms")
+    for name in registry.names():
+        print(f"{name}: {registry.strategies.get(name, name)}")
+    for filename, error in registry.errors.items():
+        print(f"Could not scan {filename}: {error}")
+
+    failed = False
+    if args.load:
+        for name in registry.names():
+            try:
+                registry.load(name)
+            except Exception as error:
+                print(f"{name} failed to import: {error!r}")
+                failed = True
+        registry.report()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
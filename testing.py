@@ -1,5 +1,13 @@
+import os
+import tempfile
 import unittest
 from harness import *
+from player import Player
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 
 class Test(unittest.TestCase):
@@ -44,6 +52,18 @@ class Test(unittest.TestCase):
         hand = [('King', 'Hearts'), ('Queen', 'Clubs'), ('Jack', 'Diamonds'), ('9', 'Spades'), ('7', 'Hearts')]
         self.assertEqual(hand_rank(hand), (1, hand), "Should be High Card")
 
+    def test_wheel_straight(self):
+        hand = [('5', 'Hearts'), ('4', 'Clubs'), ('3', 'Diamonds'), ('2', 'Spades'), ('Ace', 'Hearts')]
+        self.assertEqual(hand_rank(hand), (5, hand), "Should be a five high Straight")
+
+    def test_wheel_straight_flush(self):
+        hand = [('Ace', 'Clubs'), ('2', 'Clubs'), ('3', 'Clubs'), ('4', 'Clubs'), ('5', 'Clubs')]
+        self.assertEqual(hand_rank(hand), (9, hand), "Should be a five high Straight Flush")
+
+    def test_no_wraparound_straight(self):
+        hand = [('Queen', 'Hearts'), ('King', 'Clubs'), ('Ace', 'Diamonds'), ('2', 'Spades'), ('3', 'Hearts')]
+        self.assertEqual(hand_rank(hand)[0], 1, "Straights should not wrap around the Ace")
+
     # preflop_hand_rank() tests
     def test_pair_aces(self):
         hand = [('Ace', 'Hearts'), ('Ace', 'Spades')]
@@ -79,6 +99,439 @@ class Test(unittest.TestCase):
         self.assertEqual(preflop_hand_rank(hand), (0, hand), "Should be 3 High")
 
     # Functionality Testing
+    def test_pot_default_cards_not_shared(self):
+        pot_a = Pot()
+        pot_b = Pot()
+        pot_a.cards.append(('Ace', 'Hearts'))
+        self.assertEqual(pot_b.cards, [], "Pots should not share a default card list")
+
+    def test_pot_copies_cards(self):
+        cards = [('Ace', 'Hearts')]
+        pot = Pot(cards=cards)
+        pot.reset()
+        self.assertEqual(cards, [('Ace', 'Hearts')], "Resetting a pot should not clear the caller's list")
+
+    def test_player_reset_reuses_cards(self):
+        player = Player("Test")
+        cards = player.cards
+        cards.append(('Ace', 'Hearts'))
+        player.reset()
+        self.assertIs(player.cards, cards, "Reset should reuse the hole card list")
+        self.assertEqual(player.cards, [], "Reset should empty the hole card list")
+
+    def test_deck_reset(self):
+        deck = Deck()
+        deck.shuffle()
+        deck.draw()
+        deck.reset()
+        self.assertEqual(len(deck), 52, "Reset should restore a full deck")
+        self.assertEqual(len(set(deck.cards)), 52, "Deck should hold 52 distinct cards")
+
+    def test_slots(self):
+        with self.assertRaises(AttributeError):
+            Player("Test").nickname = "T"
+        with self.assertRaises(AttributeError):
+            Pot().winner = None
+
+    # hand_strength() tests
+    def test_strength_seven_cards(self):
+        cards = [('Ace', 'Hearts'), ('King', 'Hearts'), ('2', 'Clubs'), ('7', 'Diamonds'), ('9', 'Hearts'),
+                 ('Jack', 'Hearts'), ('4', 'Hearts')]
+        self.assertEqual(hand_strength(cards), (6, 14, 13, 11, 9, 4), "Should be an Ace high Flush")
+
+    def test_strength_wheel(self):
+        cards = [('Ace', 'Spades'), ('2', 'Hearts'), ('3', 'Clubs'), ('4', 'Diamonds'), ('5', 'Hearts')]
+        self.assertEqual(hand_strength(cards), (5, 5), "Should be a five high Straight")
+
+    def test_strength_steel_wheel(self):
+        cards = [('Ace', 'Clubs'), ('2', 'Clubs'), ('3', 'Clubs'), ('4', 'Clubs'), ('5', 'Clubs'), ('King', 'Hearts')]
+        self.assertEqual(hand_strength(cards), (9, 5), "Should be a five high Straight Flush")
+
+    def test_strength_kicker(self):
+        board = [('Jack', 'Hearts'), ('Jack', 'Clubs'), ('7', 'Diamonds'), ('4', 'Spades'), ('2', 'Hearts')]
+        ace_kicker = hand_strength([('Ace', 'Clubs'), ('9', 'Spades')] + board)
+        king_kicker = hand_strength([('King', 'Clubs'), ('9', 'Hearts')] + board)
+        self.assertGreater(ace_kicker, king_kicker, "The Ace kicker should win")
+
+    def test_strength_two_pair_kicker(self):
+        cards = [('9', 'Hearts'), ('9', 'Clubs'), ('7', 'Diamonds'), ('7', 'Spades'), ('3', 'Hearts'),
+                 ('3', 'Clubs'), ('5', 'Hearts')]
+        self.assertEqual(hand_strength(cards), (3, 9, 7, 5), "The third pair should not beat the kicker")
+
+    # Pot ledger and side pot tests
+    def test_commit_records_ledger(self):
+        pot = Pot()
+        player = Player("Test")
+        pot.commit(player, 20)
+        pot.commit(player, 40)
+        self.assertEqual(pot.chips, 60)
+        self.assertEqual(pot.contributions[player], 60)
+
+    def test_side_pot_layers(self):
+        short, medium, deep, folded = Player("Short"), Player("Medium"), Player("Deep"), Player("Folded")
+        folded.fold = True
+        pot = Pot()
+        for player, amount in [(short, 50), (medium, 100), (deep, 300), (folded, 80)]:
+            pot.commit(player, amount)
+        side_pots = handle_side_pots([short, medium, deep, folded], pot)
+        self.assertEqual([side_pot.chips for side_pot in side_pots], [200, 130, 200])
+        self.assertEqual([side_pot.contributing_players for side_pot in side_pots],
+                         [[short, medium, deep], [medium, deep], [deep]])
+        self.assertEqual(sum(side_pot.chips for side_pot in side_pots), pot.chips)
+
+    def test_showdown_awards_side_pots(self):
+        short, deep = Player("Short", chips=0), Player("Deep", chips=0)
+        short.cards = [('Ace', 'Hearts'), ('Ace', 'Spades')]
+        deep.cards = [('King', 'Hearts'), ('King', 'Spades')]
+        pot = Pot(cards=[('2', 'Clubs'), ('7', 'Diamonds'), ('9', 'Hearts'), ('Jack', 'Clubs'), ('4', 'Spades')])
+        pot.commit(short, 100)
+        pot.commit(deep, 300)
+        showdown([short, deep], pot)
+        self.assertEqual(short.chips, 200, "The all-in player should only win the main pot")
+        self.assertEqual(deep.chips, 200, "The uncalled chips should go back to the deep stack")
+
+    def test_showdown_uncontested(self):
+        winner, loser = Player("Winner", chips=0), Player("Loser", chips=0)
+        loser.fold = True
+        pot = Pot()
+        pot.commit(winner, 20)
+        pot.commit(loser, 10)
+        showdown([winner, loser], pot)
+        self.assertEqual(winner.chips, 30)
+
+    def test_blinds_fold_to_button(self):
+        from strategy import Strategy
+
+        class Fixed(Strategy):
+            def __init__(self, action):
+                self.action = action
+
+            def decide_action(self, player, community_cards, min_bet):
+                return self.action
+
+        button = Player("Button", strategy=Fixed("call"))
+        little = Player("Little", strategy=Fixed("fold"))
+        big = Player("Big", strategy=Fixed("fold"))
+        deck = Deck()
+        deck.shuffle()
+        play_hand([button, little, big], 0, deck, Pot(), 20)
+        self.assertEqual([button.chips, little.chips, big.chips], [2030, 1990, 1980])
+
+    def test_capped_raises_never_take_chips_back(self):
+        from strategy import Strategy
+
+        class AlwaysRaise(Strategy):
+            def decide_action(self, player, community_cards, min_bet):
+                return "raise"
+
+        class CheckedPot(Pot):
+            def commit(self, player, amount):
+                before = self.contributions.get(player, 0)
+                super().commit(player, amount)
+                commits.append(self.contributions[player] - before)
+
+        commits = []
+        players = [Player(name, strategy=AlwaysRaise()) for name in ["A", "B", "C"]]
+        deck = Deck()
+        deck.shuffle()
+        play_hand(players, 0, deck, CheckedPot(), 20)
+        self.assertTrue(commits)
+        self.assertTrue(all(amount >= 0 for amount in commits))
+        self.assertEqual(sum(p.chips for p in players), 6000)
+        with self.assertRaises(ValueError):
+            Pot().commit(players[0], -1)
+
+    def test_showdown_odd_chip_split(self):
+        players = [Player(name, chips=0) for name in ["First", "Second", "Third"]]
+        players[0].cards = [('2', 'Hearts'), ('3', 'Hearts')]
+        players[1].cards = [('2', 'Clubs'), ('3', 'Clubs')]
+        players[2].cards = [('2', 'Spades'), ('3', 'Spades')]
+        pot = Pot(cards=[('Ace', 'Diamonds'), ('King', 'Diamonds'), ('Queen', 'Spades'), ('Jack', 'Clubs'),
+                         ('10', 'Hearts')])
+        players[2].fold = True
+        for player, amount in zip(players, [20, 20, 5]):
+            pot.commit(player, amount)
+        showdown(players, pot)
+        self.assertEqual([player.chips for player in players], [23, 22, 0], "Odd chips go out in seat order")
+
+    # Evaluator verification tests
+    def test_evaluators_agree_on_chunk(self):
+        from verify_evaluator import check_five_card_chunk
+        result = check_five_card_chunk(40)
+        self.assertEqual(result["hands"], 330)
+        self.assertEqual(result["mismatches"], 0, result["examples"])
+
+    # CFR tests
+    @unittest.skipUnless(numpy, "numpy is not installed")
+    def test_betting_tree_rules(self):
+        from cfr import BettingTree, infoset_key
+        tree = BettingTree(blind=20)
+        legal = dict(zip(tree.keys, tree.legal.tolist()))
+        self.assertEqual(legal[infoset_key("sb", 0, 0, 10, 20)], [True, True, True], "The little blind can do anything")
+        self.assertEqual(legal[infoset_key("bb", 0, 0, 20, 20)], [False, True, True], "No folding to a limp")
+        self.assertEqual(legal[infoset_key("bb", 0, 0, 80, 160)], [True, True, False], "Three raises cap the round")
+        self.assertNotIn(infoset_key("sb", 0, 0, 10, 320), legal)
+
+    @unittest.skipUnless(numpy, "numpy is not installed")
+    def test_cfr_checkpoint_and_play(self):
+        from cfr import CFRStrategy, CFRTrainer, StrengthBucketer
+        bucketer = StrengthBucketer(num_buckets=3)
+        bucketer.calibrate(samples=200)
+        trainer = CFRTrainer(bucketer, batch_size=20)
+        trainer.train(2, log_every=0)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "cfr.npz")
+            trainer.save(path)
+            resumed = CFRTrainer.load(path, batch_size=20)
+            self.assertEqual(resumed.iterations, 2)
+            self.assertTrue(numpy.array_equal(resumed.regrets, trainer.regrets))
+            strategy = CFRStrategy(path, seed=0)
+
+        player = Player("CFR", strategy=strategy)
+        player.cards = [('Ace', 'Hearts'), ('Ace', 'Spades')]
+        player.round_bet = 20
+        self.assertIn(player.choose_action([], 20), ["call", "raise"])
+
+    # Card abstraction tests
+    @unittest.skipUnless(numpy, "numpy is not installed")
+    def test_canonical_key_suit_isomorphism(self):
+        from abstraction import canonical_key
+        hole = [('Ace', 'Hearts'), ('King', 'Hearts')]
+        board = [('2', 'Hearts'), ('7', 'Clubs'), ('Jack', 'Spades')]
+        swapped = {'Hearts': 'Diamonds', 'Diamonds': 'Hearts', 'Clubs': 'Spades', 'Spades': 'Clubs'}
+        relabelled = canonical_key([(rank, swapped[suit]) for rank, suit in hole],
+                                   [(rank, swapped[suit]) for rank, suit in reversed(board)])
+        self.assertEqual(canonical_key(hole, board), relabelled)
+        offsuit = [('Ace', 'Hearts'), ('King', 'Spades')]
+        self.assertNotEqual(canonical_key(hole, board), canonical_key(offsuit, board))
+
+    @unittest.skipUnless(numpy, "numpy is not installed")
+    def test_bucket_table_lookup(self):
+        from abstraction import BucketTable, build_tables
+        table = build_tables(("preflop",), num_buckets=4, rollouts=4, processes=1, log=lambda message: None)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "buckets.npz")
+            table.save(path)
+            table = BucketTable.load(path)
+        aces = table.bucket([('Ace', 'Hearts'), ('Ace', 'Spades')], [])
+        self.assertEqual(aces, table.bucket([('Ace', 'Clubs'), ('Ace', 'Diamonds')], []))
+        self.assertIn(aces, range(4))
+
+    @unittest.skipUnless(numpy, "numpy is not installed")
+    def test_bucket_table_missing_streets(self):
+        import random
+        from abstraction import BucketTable, build_tables
+        table = build_tables(("preflop", "flop"), num_buckets=4, rollouts=4, processes=1, limit=1,
+                             log=lambda message: None)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "buckets.npz")
+            table.save(path)
+            with self.assertRaises(ValueError):
+                BucketTable.load(path, ("preflop", "flop", "turn"))
+            table = BucketTable.load(path, ("preflop", "flop"))
+
+        hole = [('7', 'Hearts'), ('2', 'Spades')]
+        with self.assertRaises(ValueError):
+            table.bucket(hole, [('Ace', 'Clubs'), ('King', 'Clubs'), ('9', 'Diamonds'), ('4', 'Hearts')])
+
+        # Flop situations not sampled into the table fall back to seeded rollouts
+        state = random.getstate()
+        boards = [[('Ace', 'Clubs'), ('King', 'Clubs'), card] for card in [('9', 'Diamonds'), ('3', 'Clubs')]]
+        first = [table.bucket(hole, board) for board in boards]
+        self.assertEqual(first, [table.bucket(hole, board) for board in boards])
+        self.assertEqual(random.getstate(), state)
+
+    # Benchmark tests
+    def test_benchmark_regression_gate(self):
+        from benchmark import compare_results
+        baseline = {"results": {"fast": {"per_op": 1.0}, "slow": {"per_op": 1.0}}}
+        current = {"results": {"fast": {"per_op": 1.05}, "slow": {"per_op": 1.5}, "new": {"per_op": 1.0}}}
+        rows = compare_results(baseline, current, threshold=0.10)
+        self.assertEqual([(row[0], row[4]) for row in rows], [("fast", False), ("slow", True)])
+
+    def test_benchmark_suite_runs(self):
+        from benchmark import run_suite
+        results = run_suite(scale=0.001, repeat=1)
+        self.assertEqual(set(results["results"]), {"hand_rank", "preflop_hand_rank", "showdown", "handle_side_pots",
+                                                   "play_hand", "match"})
+
+
+    # Async engine tests
+    def test_async_tables_conserve_chips(self):
+        import asyncio
+        from async_harness import run_tables
+        from strategy import DefaultStrategy
+
+        class SlowStrategy(DefaultStrategy):
+            async def decide_action(self, player, community_cards, min_bet):
+                await asyncio.sleep(0)
+                return super().decide_action(player, community_cards, min_bet)
+
+        tables = [[Player(f"T{t}P{i}", strategy=SlowStrategy() if i else DefaultStrategy()) for i in range(3)]
+                  for t in range(4)]
+        hands = asyncio.run(run_tables(tables, num_hands=5, blind=20, concurrency=2))
+        self.assertEqual(len(hands), 4)
+        for players in tables:
+            self.assertEqual(sum(p.chips for p in players), 6000)
+
+    def test_socket_strategy_round_trip(self):
+        import asyncio
+        from async_harness import SocketStrategy, serve_bot
+        from strategy import Strategy
+
+        class Echo(Strategy):
+            def decide_action(self, player, community_cards, min_bet):
+                return "raise" if len(player.cards) == 2 and min_bet == 40 and community_cards else "fold"
+
+        async def run():
+            server = await serve_bot(Echo())
+            bot = SocketStrategy(port=server.sockets[0].getsockname()[1])
+            player = Player("Bot", strategy=bot)
+            player.cards.extend([('Ace', 'Spades'), ('King', 'Spades')])
+            try:
+                first = await player.achoose_action([('2', 'Hearts')], 40)
+                second = await player.achoose_action([], 40)
+            finally:
+                await bot.close()
+                server.close()
+                await server.wait_closed()
+            return first, second
+
+        self.assertEqual(asyncio.run(run()), ("raise", "fold"))
+
+
+    def test_socket_strategy_timeout_folds(self):
+        import asyncio
+        from async_harness import SocketStrategy
+
+        async def run():
+            async def never_answer(reader, writer):
+                await reader.read()
+                writer.close()
+
+            server = await asyncio.start_server(never_answer, "127.0.0.1", 0)
+            bot = SocketStrategy(port=server.sockets[0].getsockname()[1], timeout=0.05)
+            player = Player("Bot", strategy=bot)
+            try:
+                action = await player.achoose_action([], 40)
+                connected = bot._writer is not None
+            finally:
+                await bot.close()
+                server.close()
+                await server.wait_closed()
+            return action, connected
+
+        self.assertEqual(asyncio.run(run()), ("fold", False))
+
+    def test_socket_strategy_falls_back_on_dead_bots(self):
+        import asyncio
+        import socket
+        from async_harness import SocketStrategy
+
+        async def run():
+            async def hang_up(reader, writer):
+                await reader.readline()
+                writer.close()
+
+            async def garbage(reader, writer):
+                await reader.readline()
+                writer.write(b"not json\n")
+                await writer.drain()
+                writer.close()
+
+            actions = []
+            for handler in (hang_up, garbage):
+                server = await asyncio.start_server(handler, "127.0.0.1", 0)
+                bot = SocketStrategy(port=server.sockets[0].getsockname()[1], timeout=1.0)
+                try:
+                    actions.append(await Player("Bot", strategy=bot).achoose_action([], 40))
+                    actions.append(bot._writer is None)
+                finally:
+                    await bot.close()
+                    server.close()
+                    await server.wait_closed()
+
+            with socket.socket() as unused:
+                unused.bind(("127.0.0.1", 0))
+                port = unused.getsockname()[1]
+            bot = SocketStrategy(port=port, timeout=1.0, fallback="call")
+            actions.append(await Player("Bot", strategy=bot).achoose_action([], 40))
+            return actions
+
+        self.assertEqual(asyncio.run(run()), ["fold", True, "fold", True, "call"])
+
+    # Checkpoint tests
+    def test_tournament_resume_matches_uninterrupted_run(self):
+        import random
+        from strategy import DefaultStrategy
+        from tournament import Tournament
+
+        def seat():
+            return [Player(f"Player {i}", strategy=DefaultStrategy()) for i in range(3)]
+
+        random.seed(7)
+        players = seat()
+        expected = Tournament(players, matches=3, num_hands=10, blind=20)
+        expected.play()
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "run.pkl.gz")
+            random.seed(7)
+            interrupted = Tournament(seat(), matches=3, num_hands=10, blind=20)
+            while interrupted.stats["hands"] < 13:
+                if interrupted.hand <= interrupted.num_hands and not game_over(interrupted.players):
+                    interrupted.play_next_hand()
+                else:
+                    interrupted.finish_match()
+            interrupted.save(path)
+            random.seed(99)
+
+            players = seat()
+            resumed = Tournament.load(path, players)
+            self.assertEqual((resumed.match, resumed.stats["hands"]), (1, 13))
+            resumed.play(path, checkpoint_every=4)
+            self.assertFalse(os.path.exists(path + ".tmp"))
+
+        self.assertEqual(resumed.wins, expected.wins)
+        self.assertEqual(resumed.stats, expected.stats)
+        self.assertEqual([p.chips for p in players], [2000] * 3)
+
+
+    # Registry tests
+    def test_registry_finds_strategies_lazily(self):
+        import sys
+        from registry import StrategyRegistry
+
+        with tempfile.TemporaryDirectory() as directory:
+            files = {
+                "lazy_bots.py": "from strategy import Strategy\n"
+                                "import lazy_marker\n"
+                                "class Base(Strategy):\n    pass\n"
+                                "class Derived(Base):\n    def decide_action(self, *args):\n        return 'call'\n"
+                                "class Helper:\n    pass\n",
+                "lazy_marker.py": "",
+                "lazy_broken.py": "class Broken(Strategy:\n",
+            }
+            for name, source in files.items():
+                with open(os.path.join(directory, name), "w") as file:
+                    file.write(source)
+
+            registry = StrategyRegistry(directory)
+            self.assertEqual(registry.names(), ["Base", "Derived"])
+            self.assertIn("lazy_broken.py", registry.errors)
+            self.assertNotIn("lazy_bots", sys.modules)
+
+            cached = StrategyRegistry(directory)
+            self.assertEqual(cached.strategies, registry.strategies)
+            try:
+                self.assertEqual(cached.create("Derived").decide_action(), "call")
+                self.assertIn("lazy_bots:Derived", cached.import_times)
+                with self.assertRaises(LookupError):
+                    cached.load("Helper")
+            finally:
+                sys.path.remove(cached.directory)
+                sys.modules.pop("lazy_bots", None)
+                sys.modules.pop("lazy_marker", None)
 
 
 if __name__ == '__main__':
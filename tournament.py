@@ -0,0 +1,167 @@
+import gzip
+import pickle
+import random
+
+from harness import Deck, Pot, atomic_write, game_over, play_next_hand
+
+CHECKPOINT_VERSION = 1
+
+
+class Tournament:
+    """
+    A run of matches between the same players, as played by game.py, that can be checkpointed between hands and
+    resumed exactly.
+
+    A checkpoint holds everything that carries over from one hand to the next: the match and hand about to be
+    played, every player's chips, the win tallies, the accumulated statistics, the state of the random module
+    (which shuffles the deck and drives DefaultStrategy) and each player's strategy. Strategies are pickled along
+    with the run so that ones keeping state between hands resume where they were; a strategy that cannot be
+    pickled is recreated fresh on resume, which only keeps results identical if it holds no such state.
+    """
+
+    def __init__(self, players, matches, num_hands, blind):
+        """
+        Initialize a Tournament.
+
+        Args:
+            players (list of Player): Players in seat order, with the chips they start every match with.
+            matches (int): Matches to play.
+            num_hands (int): The maximum number of hands per match.
+            blind (int): The blind amount for every hand.
+        """
+        self.players = players
+        self.matches = matches
+        self.num_hands = num_hands
+        self.blind = blind
+        self.start_chips = [player.chips for player in players]
+        self.match = 0  # Index of the match in progress
+        self.hand = 1  # Number of the next hand in that match
+        self.wins = [0] * len(players)
+        self.stats = {
+            "hands": 0,  # Hands played over all matches
+            "hands_per_match": [],
+            "net_chips": [0] * len(players),  # Chips won or lost over all matches
+        }
+        self.pot = Pot()  # Reused every hand
+        self.deck = Deck()
+
+    def play(self, checkpoint=None, checkpoint_every=100):
+        """
+        Play the remaining matches, saving a checkpoint every checkpoint_every hands and at the end.
+
+        Args:
+            checkpoint (str, optional): Path of the checkpoint file.
+            checkpoint_every (int): Hands between checkpoints.
+
+        Returns:
+            list of int: Matches won by each player.
+        """
+        since_checkpoint = 0
+        while self.match < self.matches:
+            if self.hand <= self.num_hands and not game_over(self.players):
+                self.play_next_hand()
+                since_checkpoint += 1
+            else:
+                self.finish_match()
+
+            if checkpoint and since_checkpoint >= checkpoint_every:
+                self.save(checkpoint)
+                since_checkpoint = 0
+
+        if checkpoint:
+            self.save(checkpoint)
+        return self.wins
+
+    def play_next_hand(self):
+        """Play the next hand of the current match, like play_match does."""
+        play_next_hand(self.players, self.hand, self.blind, self.pot, self.deck)
+
+        self.hand += 1
+        self.stats["hands"] += 1
+
+    def finish_match(self):
+        """Print the final chip counts, score the match and reset the players for the next one."""
+        print("\nGame over. Final chip counts:")
+        chips = [player.chips for player in self.players]
+        for i, player in enumerate(self.players):
+            print(f"{player.name}: {player.chips} chips")
+            self.stats["net_chips"][i] += player.chips - self.start_chips[i]
+            player.hard_reset(player.name, player.strategy, self.start_chips[i])
+
+        self.wins[chips.index(max(chips))] += 1
+        self.stats["hands_per_match"].append(self.hand - 1)
+        self.match += 1
+        self.hand = 1
+
+    def state(self):
+        """
+        Get the run's state between hands.
+
+        Returns:
+            dict: Everything save() writes.
+        """
+        strategies = []
+        for player in self.players:
+            try:
+                strategies.append(pickle.dumps(player.strategy, pickle.HIGHEST_PROTOCOL))
+            except (pickle.PicklingError, TypeError, AttributeError):
+                strategies.append(None)
+        return {
+            "version": CHECKPOINT_VERSION,
+            "names": [player.name for player in self.players],
+            "matches": self.matches,
+            "num_hands": self.num_hands,
+            "blind": self.blind,
+            "start_chips": self.start_chips,
+            "match": self.match,
+            "hand": self.hand,
+            "chips": [player.chips for player in self.players],
+            "wins": self.wins,
+            "stats": self.stats,
+            "random": random.getstate(),
+            "strategies": strategies,
+        }
+
+    def save(self, path):
+        """
+        Save a checkpoint with atomic_write, so an interrupted save keeps the previous one.
+
+        Args:
+            path (str): Checkpoint path; one ending in .gz is compressed.
+        """
+        with atomic_write(path, opener=gzip.open if path.endswith(".gz") else open) as file:
+            pickle.dump(self.state(), file, pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path, players):
+        """
+        Resume a run from a checkpoint.
+
+        Args:
+            path (str): Checkpoint written by save().
+            players (list of Player): The same players, in the same seats, as the saved run; their chips and
+                picklable strategies are restored from the checkpoint.
+
+        Returns:
+            Tournament: The run, ready to continue with play(). The random module's state is restored as well.
+        """
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rb") as file:
+            state = pickle.load(file)
+        if state["version"] != CHECKPOINT_VERSION:
+            raise ValueError(f"{path} is a version {state['version']} checkpoint, expected {CHECKPOINT_VERSION}")
+        if state["names"] != [player.name for player in players]:
+            raise ValueError(f"{path} was saved with players {state['names']}")
+
+        tournament = cls(players, state["matches"], state["num_hands"], state["blind"])
+        tournament.start_chips = state["start_chips"]
+        tournament.match = state["match"]
+        tournament.hand = state["hand"]
+        tournament.wins = state["wins"]
+        tournament.stats = state["stats"]
+        for player, chips, strategy in zip(players, state["chips"], state["strategies"]):
+            player.chips = chips
+            if strategy is not None:
+                player.strategy = pickle.loads(strategy)
+        random.setstate(state["random"])
+        return tournament
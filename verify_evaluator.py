@@ -0,0 +1,220 @@
+import argparse
+import random
+import sys
+import time
+from itertools import combinations
+from multiprocessing import Pool, cpu_count
+
+from harness import FULL_DECK, hand_rank, hand_strength
+
+# Number of five-card hands in each hand rank, out of the 2,598,960 possible hands
+KNOWN_COUNTS = {
+    10: 4,  # Royal Flush
+    9: 36,  # Straight Flush
+    8: 624,  # Four of a Kind
+    7: 3744,  # Full House
+    6: 5108,  # Flush
+    5: 10200,  # Straight
+    4: 54912,  # Three of a Kind
+    3: 123552,  # Two Pair
+    2: 1098240,  # One Pair
+    1: 1302540,  # High Card
+}
+
+HAND_NAMES = {10: "Royal Flush", 9: "Straight Flush", 8: "Four of a Kind", 7: "Full House", 6: "Flush",
+              5: "Straight", 4: "Three of a Kind", 3: "Two Pair", 2: "One Pair", 1: "High Card"}
+
+# Number of distinct five-card hand values once suits are ignored, from 7-5-4-3-2 up to the Royal Flush
+DISTINCT_HANDS = 7462
+
+MAX_EXAMPLES = 5
+
+
+def check_five_card_chunk(first):
+    """
+    Evaluate every five-card hand whose first card is FULL_DECK[first] and whose other cards come after it.
+
+    Splitting the enumeration by first card gives 48 independent chunks that together cover each hand once.
+
+    Args:
+        first (int): Index of the hand's first card in FULL_DECK.
+
+    Returns:
+        dict: Hand rank counts and evaluation seconds per evaluator, the distinct hand_strength keys seen, the
+        number of hands where the evaluators disagree on the hand rank, and up to MAX_EXAMPLES of those hands.
+    """
+    card = FULL_DECK[first]
+    hands = [(card,) + rest for rest in combinations(FULL_DECK[first + 1:], 4)]
+
+    start = time.perf_counter()
+    ranks = [hand_rank(list(hand))[0] for hand in hands]
+    rank_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    keys = [hand_strength(hand) for hand in hands]
+    strength_seconds = time.perf_counter() - start
+
+    result = {
+        "hands": len(hands),
+        "hand_rank": {"counts": {}, "seconds": rank_seconds},
+        "hand_strength": {"counts": {}, "seconds": strength_seconds},
+        "keys": set(keys),
+        "mismatches": 0,
+        "examples": [],
+    }
+    for hand, rank, strength in zip(hands, ranks, (key[0] for key in keys)):
+        result["hand_rank"]["counts"][rank] = result["hand_rank"]["counts"].get(rank, 0) + 1
+        result["hand_strength"]["counts"][strength] = result["hand_strength"]["counts"].get(strength, 0) + 1
+        if rank != strength:
+            result["mismatches"] += 1
+            if len(result["examples"]) < MAX_EXAMPLES:
+                result["examples"].append((hand, rank, strength))
+    return result
+
+
+def check_seven_card_sample(args):
+    """
+    Check sampled seven-card hands against the best of their 21 five-card hands.
+
+    hand_strength must give the same key for the seven cards as the best key among the five-card hands, and
+    hand_rank's best hand rank among the five-card hands must match.
+
+    Args:
+        args (tuple): (seed, number of hands) for the sample.
+
+    Returns:
+        dict: Hands checked, seconds per evaluator for the seven-card evaluation, mismatches and examples.
+    """
+    seed, size = args
+    rng = random.Random(seed)
+    hands = [rng.sample(FULL_DECK, 7) for _ in range(size)]
+
+    start = time.perf_counter()
+    ranks = [max(hand_rank(list(five))[0] for five in combinations(hand, 5)) for hand in hands]
+    rank_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    strengths = [hand_strength(hand) for hand in hands]
+    strength_seconds = time.perf_counter() - start
+
+    result = {
+        "hands": size,
+        "hand_rank": {"seconds": rank_seconds},
+        "hand_strength": {"seconds": strength_seconds},
+        "mismatches": 0,
+        "examples": [],
+    }
+    for hand, rank, strength in zip(hands, ranks, strengths):
+        best = max(hand_strength(five) for five in combinations(hand, 5))
+        if strength != best or rank != strength[0]:
+            result["mismatches"] += 1
+            if len(result["examples"]) < MAX_EXAMPLES:
+                result["examples"].append((hand, rank, strength))
+    return result
+
+
+def _merge(results):
+    """Combine chunk results into one."""
+    merged = {"hands": 0, "keys": set(), "mismatches": 0, "examples": []}
+    for result in results:
+        merged["hands"] += result["hands"]
+        merged["keys"].update(result.get("keys", ()))
+        merged["mismatches"] += result["mismatches"]
+        merged["examples"].extend(result["examples"][:MAX_EXAMPLES - len(merged["examples"])])
+        for evaluator in ("hand_rank", "hand_strength"):
+            total = merged.setdefault(evaluator, {"counts": {}, "seconds": 0.0})
+            total["seconds"] += result[evaluator]["seconds"]
+            for rank, count in result[evaluator].get("counts", {}).items():
+                total["counts"][rank] = total["counts"].get(rank, 0) + count
+    return merged
+
+
+def verify(processes=None, samples=100000, seed=0):
+    """
+    Run the exhaustive five-card check and the sampled seven-card check across worker processes.
+
+    Args:
+        processes (int, optional): Worker processes (default is one per core).
+        samples (int): Seven-card hands to sample; 0 skips the seven-card check.
+        seed (int): Seed for the seven-card sample.
+
+    Returns:
+        tuple: (five-card result, seven-card result or None, wall-clock seconds for each).
+    """
+    processes = processes or cpu_count()
+    with Pool(processes) as pool:
+        start = time.perf_counter()
+        five = _merge(pool.imap_unordered(check_five_card_chunk, range(len(FULL_DECK) - 4)))
+        five_wall = time.perf_counter() - start
+
+        seven, seven_wall = None, 0.0
+        if samples:
+            chunk = -(-samples // processes)
+            jobs = [(seed + i, min(chunk, samples - i * chunk)) for i in range(processes) if i * chunk < samples]
+            start = time.perf_counter()
+            seven = _merge(pool.imap_unordered(check_seven_card_sample, jobs))
+            seven_wall = time.perf_counter() - start
+
+    return five, seven, five_wall, seven_wall
+
+
+def count_errors(five):
+    """
+    List every hand rank whose count differs from KNOWN_COUNTS.
+
+    Args:
+        five (dict): Merged five-card result from verify.
+
+    Returns:
+        list of tuple: (evaluator, hand rank, expected count, counted) for each wrong count.
+    """
+    errors = []
+    for evaluator in ("hand_rank", "hand_strength"):
+        counts = five[evaluator]["counts"]
+        for rank, expected in KNOWN_COUNTS.items():
+            if counts.get(rank, 0) != expected:
+                errors.append((evaluator, rank, expected, counts.get(rank, 0)))
+    return errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify hand evaluators over every five-card hand.")
+    parser.add_argument("--processes", type=int, default=None, help="Worker processes (default is one per core).")
+    parser.add_argument("--samples", type=int, default=100000, help="Seven-card hands to sample (0 to skip).")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the seven-card sample.")
+    args = parser.parse_args(argv)
+
+    five, seven, five_wall, seven_wall = verify(args.processes, args.samples, args.seed)
+
+    print(f"Five-card hands: {five['hands']} in {five_wall:.1f}s")
+    print(f"{'Hand':<16} {'Expected':>9} {'hand_rank':>10} {'hand_strength':>14}")
+    for rank in sorted(KNOWN_COUNTS, reverse=True):
+        print(f"{HAND_NAMES[rank]:<16} {KNOWN_COUNTS[rank]:>9} {five['hand_rank']['counts'].get(rank, 0):>10} "
+              f"{five['hand_strength']['counts'].get(rank, 0):>14}")
+    for evaluator in ("hand_rank", "hand_strength"):
+        print(f"{evaluator}: {five['hands'] / five[evaluator]['seconds']:.0f} hands/s per core")
+    print(f"Distinct hand_strength values: {len(five['keys'])} (expected {DISTINCT_HANDS})")
+    print(f"Hand rank disagreements: {five['mismatches']}")
+    for hand, rank, strength in five["examples"]:
+        print(f"  {hand}: hand_rank {rank}, hand_strength {strength}")
+
+    if seven:
+        print(f"\nSeven-card hands: {seven['hands']} sampled in {seven_wall:.1f}s")
+        for evaluator in ("hand_rank", "hand_strength"):
+            print(f"{evaluator}: {seven['hands'] / seven[evaluator]['seconds']:.0f} hands/s per core")
+        print(f"Disagreements with the best five-card hand: {seven['mismatches']}")
+        for hand, rank, strength in seven["examples"]:
+            print(f"  {hand}: hand_rank {rank}, hand_strength {strength}")
+
+    errors = count_errors(five)
+    for evaluator, rank, expected, counted in errors:
+        print(f"{evaluator} counted {counted} {HAND_NAMES[rank]} hands, expected {expected}")
+
+    failed = (errors or len(five["keys"]) != DISTINCT_HANDS or five["mismatches"]
+              or (seven and seven["mismatches"]))
+    print("\nFAILED" if failed else "\nOK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())